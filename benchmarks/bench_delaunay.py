@@ -0,0 +1,93 @@
+import geopandas as gpd
+import numpy as np
+from time import perf_counter
+from math import atan2, degrees
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.triangulation import triangulate_polygon
+from src.delaunay import delaunay_flip
+from src.triangle_mesh import TriangleMesh
+from bench_route_many import random_pairs
+
+""" Triangle quality, point location walk lengths and sleeve lengths of the monotone triangulation before and after
+the Delaunay edge flips (delaunay.py), on the largest polygons of a GSHHS shapefile.
+
+walk   : number of triangles crossed by the segment between two random points that see each other (the walk of a
+         walking point location / of TriangleMesh.is_visible)
+sleeve : number of triangles of the sleeve between two random points
+
+Usage (from the root of the repository):
+python benchmarks/bench_delaunay.py --shapefile data/shapefiles/GSHHS_shp/c/GSHHS_c_L1.shp --polygons 20
+"""
+
+
+def min_angles(mesh):
+    """ The smallest angle (in degrees) of every triangle """
+    angles = []
+    for t in range(len(mesh)):
+        corners = mesh.triangle_coordinates(t)
+        smallest = 180.0
+        for k in range(3):
+            o, a, b = corners[k], corners[(k + 1) % 3], corners[k - 1]
+            cross = (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+            dot = (a[0] - o[0]) * (b[0] - o[0]) + (a[1] - o[1]) * (b[1] - o[1])
+            smallest = min(smallest, degrees(atan2(abs(cross), dot)))
+        angles.append(smallest)
+    return np.array(angles)
+
+
+def walk_and_sleeve_lengths(mesh, pairs):
+    walks = []
+    sleeves = []
+    located = mesh.locate_points(pairs.reshape(-1, 2)).reshape(-1, 2)
+    for (p, q), (t_p, t_q) in zip(pairs.tolist(), located.tolist()):
+        if t_p == -1 or t_q == -1:
+            continue
+        walk = mesh.segment_walk(tuple(p), tuple(q), t_p)
+        if walk is not None:
+            walks.append(len(walk))
+        sleeves.append(len(mesh.find_sleeve(t_p, t_q)))
+    return walks, sleeves
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shapefile', default='data/shapefiles/GSHHS_shp/c/GSHHS_c_L1.shp')
+    parser.add_argument('--polygons', type=int, default=20, help='number of (largest) polygons')
+    parser.add_argument('--pairs', type=int, default=200, help='random point pairs per polygon')
+    args = parser.parse_args()
+
+    df = gpd.read_file(args.shapefile)
+    rng = np.random.default_rng(0)
+    stats = {'monotone': [[], [], [], 0.0], 'delaunay': [[], [], [], 0.0]}  # min angles, walks, sleeves, time
+    flips = 0
+    for index in df.geometry.area.sort_values(ascending=False).index[:args.polygons].tolist():
+        poly = df.geometry[index]
+        pairs = random_pairs([poly], args.pairs, rng)
+
+        t = perf_counter()
+        triangulated_dcel = triangulate_polygon(poly)
+        stats['monotone'][3] += perf_counter() - t
+        meshes = {'monotone': TriangleMesh.from_dcel(triangulated_dcel)}
+        t = perf_counter()
+        flips += delaunay_flip(triangulated_dcel)
+        stats['delaunay'][3] += perf_counter() - t
+        meshes['delaunay'] = TriangleMesh.from_dcel(triangulated_dcel)
+
+        for name, mesh in meshes.items():
+            walks, sleeves = walk_and_sleeve_lengths(mesh, pairs)
+            stats[name][0].extend(min_angles(mesh).tolist())
+            stats[name][1].extend(walks)
+            stats[name][2].extend(sleeves)
+
+    print(f"{args.shapefile}, {args.polygons} largest polygons, {len(stats['monotone'][0])} triangles, "
+          f"{flips} flips ({stats['delaunay'][3]:.2f}s, triangulation {stats['monotone'][3]:.2f}s)")
+    print(f"{'':>10} {'min angle (median)':>19} {'< 5 degrees':>12} {'walk (mean)':>12} {'walk (max)':>11} "
+          f"{'sleeve (mean)':>14} {'sleeve (max)':>13}")
+    for name, (angles, walks, sleeves, _) in stats.items():
+        angles = np.array(angles)
+        print(f"{name:>10} {np.median(angles):19.2f} {np.mean(angles < 5):12.1%} {np.mean(walks):12.2f} "
+              f"{np.max(walks):11d} {np.mean(sleeves):14.2f} {np.max(sleeves):13d}")
@@ -0,0 +1,57 @@
+import geopandas as gpd
+import numpy as np
+from time import perf_counter
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.triangulation import triangulate_polygon
+from src.triangle_mesh import TriangleMesh
+from src.simple_funnel import funnel_shortest_path_from_portals, exact_funnel_shortest_path_from_portals
+from src.routing import path_length
+from bench_route_many import random_pairs
+
+""" The original funnel (funnel_shortest_path) against the exact Lee-Preparata funnel (exact_funnel_shortest_path)
+on the same sleeves of random point pairs in GSHHS polygons. Only the funnel itself is timed (the sleeves and
+portals are computed beforehand).
+
+Usage (from the root of the repository):
+python benchmarks/bench_funnel.py --pairs 2000
+"""
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shapefile', default='data/shapefiles/GSHHS_shp/c/GSHHS_c_L1.shp')
+    parser.add_argument('--polygons', type=int, default=20, help='number of (largest) polygons the pairs lie in')
+    parser.add_argument('--pairs', type=int, default=2000)
+    args = parser.parse_args()
+
+    df = gpd.read_file(args.shapefile)
+    rng = np.random.default_rng(0)
+    queries = []  # (bot_portals, top_portals, start, dest)
+    for index in df.geometry.area.sort_values(ascending=False).index[:args.polygons].tolist():
+        mesh = TriangleMesh.from_dcel(triangulate_polygon(df.geometry[index]))
+        pairs = random_pairs([df.geometry[index]], args.pairs // args.polygons, rng)
+        located = mesh.locate_points(pairs.reshape(-1, 2)).reshape(-1, 2)
+        for (start, dest), (t_start, t_dest) in zip(pairs.tolist(), located.tolist()):
+            if t_start != -1 and t_dest != -1:
+                queries.append((*mesh.portals(mesh.find_sleeve(t_start, t_dest)), tuple(start), tuple(dest)))
+
+    portals = sum(len(q[0]) for q in queries)
+    print(f"{len(queries)} sleeves, {portals / len(queries):.1f} portals per sleeve on average")
+    results = dict()
+    for name, funnel in (('funnel_shortest_path', funnel_shortest_path_from_portals),
+                         ('exact_funnel_shortest_path', exact_funnel_shortest_path_from_portals)):
+        t = perf_counter()
+        results[name] = [funnel(*q) for q in queries]
+        elapsed = perf_counter() - t
+        print(f"{name:>28}: {elapsed:7.2f}s  {elapsed / len(queries) * 1e6:9.1f} us/query  "
+              f"{elapsed / portals * 1e6:6.2f} us/portal")
+
+    old = np.array([path_length(p) for p in results['funnel_shortest_path']])
+    exact = np.array([path_length(p) for p in results['exact_funnel_shortest_path']])
+    print(f"paths that differ: {np.count_nonzero(~np.isclose(old, exact))} / {len(queries)}, "
+          f"old funnel longer: {np.count_nonzero(old > exact + 1e-9)}, "
+          f"old funnel shorter (cuts through the boundary): {np.count_nonzero(old < exact - 1e-9)}")
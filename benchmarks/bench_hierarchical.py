@@ -0,0 +1,61 @@
+import geopandas as gpd
+import numpy as np
+from time import perf_counter
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.triangulation import triangulate_polygon
+from src.triangle_mesh import TriangleMesh
+from src.router import Router
+from src.hierarchical import HierarchicalRouter
+from src.routing import path_length
+from bench_route_many import random_pairs
+
+""" Coarse-to-fine routing (HierarchicalRouter) against routing on the whole fine polygon, for random point pairs in
+the largest polygons of the fine resolution. Reports the first-query latency of both (the whole fine polygon has to
+be triangulated first), the number of fine vertices that are triangulated per query and the path lengths.
+
+Usage (from the root of the repository):
+python benchmarks/bench_hierarchical.py --coarse data/shapefiles/GSHHS_shp/c/GSHHS_c_L1.shp
+                                        --fine data/shapefiles/GSHHS_shp/l/GSHHS_l_L1.shp --pairs 100
+"""
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--coarse', default='data/shapefiles/GSHHS_shp/c/GSHHS_c_L1.shp')
+    parser.add_argument('--fine', default='data/shapefiles/GSHHS_shp/l/GSHHS_l_L1.shp')
+    parser.add_argument('--polygons', type=int, default=5, help='number of (largest) fine polygons the pairs lie in')
+    parser.add_argument('--pairs', type=int, default=100)
+    parser.add_argument('--margin', type=float, default=0.5)
+    args = parser.parse_args()
+
+    coarse = gpd.read_file(args.coarse)
+    fine = gpd.read_file(args.fine)
+    hierarchical = HierarchicalRouter(coarse, fine, margin=args.margin)
+    rng = np.random.default_rng(0)
+    for index in fine.geometry.area.sort_values(ascending=False).index[:args.polygons].tolist():
+        poly = fine.geometry[index]
+        pairs = [(tuple(start), tuple(dest)) for start, dest in
+                 random_pairs([poly], args.pairs // args.polygons, rng).tolist()]
+
+        t = perf_counter()
+        router = Router(TriangleMesh.from_dcel(triangulate_polygon(poly)))
+        build = perf_counter() - t
+        t = perf_counter()
+        full = [router.shortest_path(start, dest) for start, dest in pairs]
+        full_time = (perf_counter() - t) / len(pairs)
+
+        hierarchical.shortest_path(*pairs[0])  # triangulates the coarse polygon
+        t = perf_counter()
+        corridor = [hierarchical.shortest_path(start, dest) for start, dest in pairs]
+        corridor_time = (perf_counter() - t) / len(pairs)
+        corridor_vertices = np.mean([len(hierarchical.corridor(start, dest).exterior.coords) for start, dest in pairs])
+
+        ratio = np.array([path_length(c) / path_length(f) if path_length(f) else 1 for c, f in zip(corridor, full)])
+        print(f"{fine['id'][index]:>6}: {len(poly.exterior.coords):6d} fine vertices, "
+              f"whole polygon: first query {(build + full_time) * 1e3:8.1f} ms, then {full_time * 1e3:6.1f} ms | "
+              f"corridor: {corridor_vertices:7.1f} vertices, {corridor_time * 1e3:6.1f} ms per query | "
+              f"length ratio mean {ratio.mean():.4f} max {ratio.max():.4f}")
@@ -0,0 +1,60 @@
+import geopandas as gpd
+import shapely
+import numpy as np
+from time import perf_counter
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.routing import BatchRouter
+
+""" Throughput of BatchRouter.route_many on random point pairs of a GSHHS shapefile.
+
+Both endpoints of a pair are drawn uniformly inside the same polygon (among the --polygons largest ones), so every
+pair is routable. The first batch pays for the triangulations, the second one is timed with warm caches.
+
+Usage (from the root of the repository):
+python benchmarks/bench_route_many.py --pairs 10000 100000 1000000
+"""
+
+
+def random_pairs(polygons, n, rng):
+    """ n pairs of points, both points of a pair inside the same (randomly chosen) polygon """
+    choice = rng.integers(len(polygons), size=n)
+    pairs = np.empty((n, 2, 2))
+    for i, poly in enumerate(polygons):
+        members = np.flatnonzero(choice == i)
+        min_x, min_y, max_x, max_y = poly.bounds
+        found = np.empty((0, 2))
+        while len(found) < 2 * len(members):  # rejection sampling in the bounding box
+            candidates = rng.uniform((min_x, min_y), (max_x, max_y), size=(4 * len(members) + 16, 2))
+            found = np.vstack([found, candidates[shapely.contains_xy(poly, candidates[:, 0], candidates[:, 1])]])
+        pairs[members] = found[:2 * len(members)].reshape(-1, 2, 2)
+    return pairs
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shapefile', default='data/shapefiles/GSHHS_shp/c/GSHHS_c_L1.shp')
+    parser.add_argument('--polygons', type=int, default=50, help='number of (largest) polygons the pairs lie in')
+    parser.add_argument('--pairs', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--convex', action='store_true', help='route over the cells of a convex partition')
+    parser.add_argument('--delaunay', action='store_true', help='refine the triangulations with Delaunay flips')
+    args = parser.parse_args()
+
+    df = gpd.read_file(args.shapefile)
+    rng = np.random.default_rng(0)
+    batch_router = BatchRouter(df.geometry, convex_cells=args.convex, delaunay=args.delaunay)
+    polygon_ids = df.geometry.area.sort_values(ascending=False).index[:args.polygons].tolist()
+
+    t = perf_counter()
+    batch_router.route_many(random_pairs([df.geometry[i] for i in polygon_ids], 1000, rng))
+    print(f"warm-up (triangulation of {len(batch_router.meshes)} polygons): {perf_counter() - t:.2f}s")
+
+    for n in args.pairs:
+        pairs = random_pairs([df.geometry[i] for i in polygon_ids], n, rng)
+        t = perf_counter()
+        paths, lengths = batch_router.route_many(pairs)
+        elapsed = perf_counter() - t
+        print(f"{n:>9} pairs: {elapsed:8.2f}s  {n / elapsed:10.0f} pairs/s  routed: {np.count_nonzero(~np.isnan(lengths))}")
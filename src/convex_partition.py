@@ -0,0 +1,72 @@
+from .triangulation import triangulate_polygon
+
+""" Convex partition of a simple polygon (Hertel and Mehlhorn, Fast triangulations of simple polygons, 1983).
+
+Starting from a triangulation, every diagonal whose removal leaves a convex face is removed ('inessential' diagonal).
+The diagonals are examined in order and a diagonal is inessential when both of its endpoints stay convex in
+the merged face. A corner of exactly 180 degrees counts as convex (a collinear vertex of the polygon would otherwise
+keep its diagonals), so the result has at most 4 times the minimum number of convex pieces, also when the polygon
+has collinear vertices.
+
+Coastline triangulations are long chains of thin triangles, so sleeves are long and the funnel goes through many
+redundant portals. The cells of a convex partition can be used exactly like triangles (TriangleMesh.from_dcel accepts
+a partitioned DCEL): the sleeves go through far fewer cells and have far fewer portals.
+"""
+
+
+def is_diagonal(hedge):
+    """ Whether the half-edge is a diagonal, i.e. both of the faces it separates are bounded """
+    return hedge.incident_face.outer_component is not None and hedge.twin.incident_face.outer_component is not None
+
+
+def is_inessential(e1):
+    """ Whether removing the diagonal e1 leaves a convex face, i.e. both endpoints of e1 stay convex
+
+    Keyword arguments:
+    :param e1 : a half-edge of a diagonal of a DCEL with convex bounded faces
+    :returns True if the diagonal can be removed
+    """
+    e2 = e1.twin
+    u = e1.origin.coordinates
+    v = e2.origin.coordinates
+    # After the removal the boundary goes e1.prev -> u -> e2.next and e2.prev -> v -> e1.next. Both turns must be
+    # left turns or straight (the faces are counter-clockwise and the merged corner is less than 360 degrees, so a
+    # zero cross product means 180 degrees)
+    return (not cw_turn(e1.prev.origin.coordinates, u, e2.next.twin.origin.coordinates) and
+            not cw_turn(e2.prev.origin.coordinates, v, e1.next.twin.origin.coordinates))
+
+
+def cw_turn(a, b, c):
+    """ Whether a -> b -> c is a strict right (clockwise) turn """
+    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]) < 0
+
+
+def convex_partition(triangulated_dcel):
+    """ Merge the triangles of a triangulated DCEL into convex faces by removing the inessential diagonals
+
+    Keyword arguments:
+    :param triangulated_dcel : a triangulated DCEL (modified in place)
+    :returns The same DCEL, where every bounded face is a convex polygon
+    """
+    removed = set()
+    # Every diagonal is met twice in the list of half-edges (once per half-edge). Looking at it again after other
+    # removals is harmless: it is only removed if the merged face is still convex
+    for hedge in triangulated_dcel.hedges:
+        if hedge in removed or hedge.twin in removed or not is_diagonal(hedge):
+            continue
+        if is_inessential(hedge):
+            triangulated_dcel.remove_diagonal(hedge, update_hedges=False)
+            removed.add(hedge)
+            removed.add(hedge.twin)
+    triangulated_dcel.hedges = [hedge for hedge in triangulated_dcel.hedges if hedge not in removed]
+    return triangulated_dcel
+
+
+def convex_partition_polygon(poly):
+    """ Convex partition of a simple polygon
+
+    Keyword arguments:
+    :param poly: A simple polygon
+    :return: the DCEL storing the convex partition of the polygon
+    """
+    return convex_partition(triangulate_polygon(poly))
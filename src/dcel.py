@@ -1,4 +1,4 @@
-from shapely.geometry import polygon
+from shapely.geometry import polygon, Polygon, Point
 from itertools import pairwise
 
 
@@ -10,8 +10,8 @@ class Vertex:
 
         # The edge bounding the interior of the polygon that has this Vertex as its origin
         # Note: In the general documentation of DCEL this is defined as 'An arbitrary half-edge TODO: Generalize
-        # that has this Vertex as its origin', but because we know we will operate on simple polygons,
-        # we redefined it as above. Our definition will be maintained throughout the program.
+        # that has this Vertex as its origin', but because we know we will operate on polygons (possibly with
+        # holes), we redefined it as above. Our definition will be maintained throughout the program.
         self.incident_edge = None
 
     def is_above(self, vertex):
@@ -64,8 +64,8 @@ class Hedge:
 
 class Dcel:
     """ Implementation of a doubly-connected edge list.
-     We know that the use of Dcel will be to operate on simple polygons. Thus, only the necessary for this project
-     functions will be created. TODO: Generalize for polygons with holes """
+     We know that the use of Dcel will be to operate on polygons (possibly with holes). Thus, only the necessary for
+     this project functions will be created. """
 
     def __init__(self):
         self.vertices = []
@@ -73,39 +73,41 @@ class Dcel:
         self.faces = set()  # Because we want O(1) element removal time complexity
 
     def build_from_polygon(self, poly):
-        """ Build a dcel from a simple polygon (we assume there are no holes!)
+        """ Build a dcel from a polygon. The interior rings of the polygon (its holes) become the inner_components of
+        the bounded face.
 
         Keyword arguments:
-        :param poly : A simple polygon
+        :param poly : A polygon (the exterior and the holes must be simple and must not touch each other)
         """
-
-        # Step 1: Vertex list creation  (Careful: exterior.coords returns a duplicate of the first vertex at the end!)
-        for coordinates in polygon.orient(poly).exterior.coords[:-1]:  # counter-clockwise traversal of poly vertices
-            self.vertices.append(Vertex(coordinates))
-
-        # Step 2: half-edge list creation. Assignment of twins and vertices
-        for v_origin, v_des in pairwise(self.vertices):  # ccw traversal of poly vertices
-            h1 = Hedge(v_origin)  # half-edge that bounds the interior face of the polygon
-            h2 = Hedge(v_des)  # half-edge that bounds the exterior face of the polygon
-            h1.twin = h2
-            h2.twin = h1
-            v_origin.incident_edge = h1  # Following the definition of incident_edge
-            self.hedges.append(h1)
-            self.hedges.append(h2)
-        # Create half-edge connecting last vertex to the fist vertex (also create the twin)
-        h1 = Hedge(self.vertices[-1])
-        h2 = Hedge(self.vertices[0])
-        h1.twin = h2
-        h2.twin = h1
-        self.vertices[-1].incident_edge = h1
-        self.hedges.append(h1)
-        self.hedges.append(h2)
+        # polygon.orient returns the exterior in counter-clockwise and the holes in clockwise order. Thus, for every
+        # ring, the interior of the polygon lies to the left of the traversal.
+        poly = polygon.orient(poly)
+        rings = [poly.exterior] + list(poly.interiors)
+
+        # Step 1 and 2: For every ring create its vertices, half-edges and twins. h1 (even positions of self.hedges)
+        # bounds the interior face of the polygon and h2 (odd positions) the exterior. The first ring is the exterior,
+        # so hedges[0] is always a half-edge bounding the interior face of the polygon.
+        ring_starts = []  # first h1 of every ring
+        for ring in rings:
+            # Careful: coords returns a duplicate of the first vertex at the end!
+            ring_vertices = [Vertex(coordinates) for coordinates in ring.coords[:-1]]
+            self.vertices.extend(ring_vertices)
+            ring_starts.append(len(self.hedges))
+            # ring traversal of the vertices (the last half-edge connects the last vertex to the first one)
+            for v_origin, v_des in pairwise(ring_vertices + ring_vertices[:1]):
+                h1 = Hedge(v_origin)  # half-edge that bounds the interior face of the polygon
+                h2 = Hedge(v_des)  # half-edge that bounds the exterior face of the polygon
+                h1.twin = h2
+                h2.twin = h1
+                v_origin.incident_edge = h1  # Following the definition of incident_edge
+                self.hedges.append(h1)
+                self.hedges.append(h2)
 
         # Step 3: Identification of next and prev hedges
         # Notice that in the vertex creation above, following the definition of incident_edge, incident edges
         # are always edges that bound the interior face of the polygon. We use this and easily determine
         # the next, prev hedges bellow.
-        # ccw traversal of poly half-edges (h1, h2 are always twins, and h1 bounds interior of the polygon)
+        # ring traversal of poly half-edges (h1, h2 are always twins, and h1 bounds interior of the polygon)
         for h1, h2 in zip(self.hedges[0::2], self.hedges[1::2]):
             h1_next = h2.origin.incident_edge
             h2_prev = h1_next.twin
@@ -116,44 +118,57 @@ class Dcel:
             h2.prev = h2_prev
             h2_prev.next = h2
 
-        # Step 4: Face assignment (2 faces)
-        start_inner_hedge = self.hedges[0]
-        start_outer_hedge = self.hedges[1]
+        # Step 4: Face assignment (2 faces). The bounded face has the exterior ring as its outer component and the
+        # holes as its inner components. Everything outside the polygon (also the inside of the holes) is the
+        # unbounded face.
+        unbounded_face = Face()
+        bounded_face = Face()
+        bounded_face.outer_component = self.hedges[0]
+        for ring_start in ring_starts:
+            unbounded_face.inner_components.append(self.hedges[ring_start + 1])
+            if ring_start:
+                bounded_face.inner_components.append(self.hedges[ring_start])
+            self.assign_face(self.hedges[ring_start], bounded_face)
+            self.assign_face(self.hedges[ring_start + 1], unbounded_face)
+        self.faces.add(unbounded_face)
+        self.faces.add(bounded_face)
 
-        # Unbounded face
-        f = Face()
-        f.inner_components.append(start_outer_hedge)
-        tmp_hedge = start_outer_hedge
+    @staticmethod
+    def assign_face(hedge, f):
+        """ Loop around the boundary component of hedge and assign f as the incident_face of every half-edge """
+        tmp_hedge = hedge
         while True:
             tmp_hedge.incident_face = f
             tmp_hedge = tmp_hedge.next
-            if tmp_hedge is start_outer_hedge:
+            if tmp_hedge is hedge:
                 break
-        self.faces.add(f)
 
-        # Bounded face
-        f = Face()
-        f.outer_component = start_inner_hedge
-        tmp_hedge = start_inner_hedge
-        while True:
-            tmp_hedge.incident_face = f
-            tmp_hedge = tmp_hedge.next
-            if tmp_hedge is start_inner_hedge:
-                break
-        self.faces.add(f)
+    def add_hole(self, f, hedge):
+        """ Make the boundary component of hedge a hole of face f (in case it is not already one)
+
+        Keyword arguments:
+        :param f -- a bounded face
+        :param hedge -- a half-edge on the boundary of the hole (the side facing f)
+        """
+        self.assign_face(hedge, f)
+        f.inner_components.append(hedge)
 
     def insert_diagonal(self, v1, v2, f):
-        """ Insert diagonal v1v2 in the dcel.
+        """ Insert diagonal v1v2 in the dcel. If v1 and v2 lie on the same boundary component of f then f is split in
+        two faces (the holes of f are moved to the one they lie in). If they lie on different boundary components
+        (the outer one and a hole, or two holes) then the two components are joined and f is kept.
+        (v1 and v2 must not be two vertices of the same hole)
 
         Keyword arguments:
         :param v1 -- Vertex
         :param v2 -- Vertex
-        :param f -- face that the diagonal v1v2 splits
+        :param f -- face that the diagonal v1v2 splits (or whose boundary components it joins)
         :return: The inserted half-edge from v1 to v2
         """
 
-        h1 = self.find_hedge_bounding_face_from_origin(v1, f)  # half-edge with origin v1 that bounds face f
-        h2 = self.find_hedge_bounding_face_from_origin(v2, f)  # half-edge with origin v2 that bounds face f
+        # half-edges with origin v1 (v2) that bound face f, in the corner of f that the diagonal passes through
+        h1 = self.find_hedge_bounding_face_from_origin(v1, f, v2)
+        h2 = self.find_hedge_bounding_face_from_origin(v2, f, v1)
 
         e1 = Hedge(v1)  # half-edge from v1 to v2
         e2 = Hedge(v2)  # half-edge from v2 to v1
@@ -177,7 +192,27 @@ class Dcel:
         h2.prev.next = e2
         h2.prev = e1
 
-        # Step 3: Remove the old face (which was split in two) and create the two new faces and link them.
+        # Step 3: If v1 and v2 lay on different boundary components of f (e.g. v2 on the outer boundary and v1 on a
+        # hole), the diagonal joins the two components into one and f is not split.
+        component = []  # the boundary component of e1 after the insertion
+        joined = False
+        tmp_hedge = e1
+        while True:
+            component.append(tmp_hedge)
+            joined = joined or tmp_hedge is e2
+            tmp_hedge = tmp_hedge.next
+            if tmp_hedge is e1:
+                break
+        if joined:
+            e1.incident_face = e2.incident_face = f
+            component = set(component)
+            joined_holes = [hedge for hedge in f.inner_components if hedge in component]
+            f.inner_components = [hedge for hedge in f.inner_components if hedge not in component]
+            if joined_holes and f.outer_component not in component:  # two holes were joined into one
+                f.inner_components.append(e1)
+            return e1
+
+        # Step 4: Remove the old face (which was split in two) and create the two new faces and link them.
         f1 = Face()  # face that is bounded by the newly created half-edge e1
         f2 = Face()  # face that is bounded by the newly created half-edge e2
         self.faces.add(f1)
@@ -187,24 +222,85 @@ class Dcel:
         f1.outer_component = e1
         f2.outer_component = e2
 
-        # Loop around face f1 and assign every interior edge its new face
-        tmp_hedge = e1
-        while True:
+        # Assign every interior edge of f1, f2 its new face
+        for tmp_hedge in component:
             tmp_hedge.incident_face = f1
-            tmp_hedge = tmp_hedge.next
-            if tmp_hedge is e1:
-                break
+        self.assign_face(e2, f2)
+
+        # The holes of f now lie either inside f1 or inside f2. (A point in polygon test against the whole boundary of
+        # f1, O(n) per split. make_monotone never gets here: it keeps the holes out of the faces until they are joined)
+        if f.inner_components:
+            f1_polygon = Polygon([hedge.origin.coordinates for hedge in component])
+            for hedge in f.inner_components:
+                self.add_hole(f1 if f1_polygon.contains(Point(hedge.origin.coordinates)) else f2, hedge)
+
+        return e1
 
-        # Loop around face f2 and assign every interior edge its new face
-        tmp_hedge = e2
+    def remove_diagonal(self, e1, update_hedges=True):
+        """ Remove diagonal e1 (and its twin) from the dcel. The two faces on either side are merged into one.
+        (Inverse of insert_diagonal)
+
+        Keyword arguments:
+        :param e1 -- a half-edge of the diagonal (both faces it separates must be bounded)
+        :param update_hedges -- remove the two half-edges from self.hedges (O(n)). When many diagonals are removed
+                                at once, pass False and filter self.hedges once at the end
+        :return: The merged face
+        """
+        e2 = e1.twin
+        f1 = e1.incident_face  # the merged face (f1 is kept)
+        f2 = e2.incident_face  # removed
+
+        # Step 1: Bypass e1, e2. (e1.prev -> e2.next and e2.prev -> e1.next)
+        e1.prev.next = e2.next
+        e2.next.prev = e1.prev
+        e2.prev.next = e1.next
+        e1.next.prev = e2.prev
+
+        # Step 2: The half-edges of f2 now bound f1 (they go from e2.next up to e2.prev)
+        tmp_hedge = e2.next
         while True:
-            tmp_hedge.incident_face = f2
-            tmp_hedge = tmp_hedge.next
-            if tmp_hedge is e2:
+            tmp_hedge.incident_face = f1
+            if tmp_hedge is e2.prev:
                 break
+            tmp_hedge = tmp_hedge.next
+        f1.outer_component = e1.next
+        self.faces.remove(f2)  # O(1) because faces is a set
 
-        return e1
+        if update_hedges:
+            self.hedges.remove(e1)
+            self.hedges.remove(e2)
+        return f1
 
+    @staticmethod
+    def flip_diagonal(e1):
+        """ Flip diagonal e1 of two adjacent triangles: the diagonal uv of the quadrilateral u, b, v, a (where uva and
+        vub are the two triangles) is replaced by the other diagonal ab. The half-edges and faces are reused, thus no
+        list or set of the dcel changes. The quadrilateral must be convex.
+
+        Keyword arguments:
+        :param e1 -- the half-edge from u to v (its face and the face of its twin must be triangles)
+        :return: e1, which is now the half-edge from a to b
+        """
+        e2 = e1.twin
+        f1 = e1.incident_face
+        f2 = e2.incident_face
+        e1_next, e1_prev = e1.next, e1.prev  # v -> a, a -> u
+        e2_next, e2_prev = e2.next, e2.prev  # u -> b, b -> v
+
+        e1.origin = e1_prev.origin  # a
+        e2.origin = e2_prev.origin  # b
+
+        # Triangle f1 becomes (a, b, v) and triangle f2 becomes (b, a, u)
+        e1.next, e2_prev.next, e1_next.next = e2_prev, e1_next, e1
+        e1.prev, e2_prev.prev, e1_next.prev = e1_next, e1, e2_prev
+        e2.next, e1_prev.next, e2_next.next = e1_prev, e2_next, e2
+        e2.prev, e1_prev.prev, e2_next.prev = e2_next, e2, e1_prev
+
+        e2_prev.incident_face = f1
+        e1_prev.incident_face = f2
+        f1.outer_component = e1
+        f2.outer_component = e2
+        return e1
 
     @staticmethod
     def find_all_vertices_bounding_face(f):
@@ -219,12 +315,31 @@ class Dcel:
         return vertices
 
     @staticmethod
-    def find_hedge_bounding_face_from_origin(v, f):
-        """ Given a vertex v and a face f return the half-edge that has as origin v and bounds f """
+    def find_hedge_bounding_face_from_origin(v, f, towards=None):
+        """ Given a vertex v and a face f return the half-edge that has as origin v and bounds f
+
+        Keyword arguments:
+        :param v -- Vertex
+        :param f -- Face
+        :param towards -- A Vertex. When v appears more than once on the boundary of f (the vertices where a hole was
+                          joined to the boundary of f) the half-edge of the corner of f that contains the direction
+                          from v to towards is returned
+        """
         hedge = v.incident_edge
         while hedge.incident_face is not f:
             hedge = hedge.prev.twin
-        return hedge
+        if towards is None:
+            return hedge
+
+        first = hedge
+        while True:
+            # The corner of f at v goes counter-clockwise from the direction of hedge to the direction of hedge.prev
+            if hedge.incident_face is f and in_corner(hedge.twin.origin.coordinates, v.coordinates,
+                                                      hedge.prev.origin.coordinates, towards.coordinates):
+                return hedge
+            hedge = hedge.prev.twin
+            if hedge is first:
+                return first
 
     @staticmethod
     def find_hedge_connecting_origin_dest(orig, dest):
@@ -252,9 +367,26 @@ class Dcel:
 
         # loop around all half-edges with origin v2 and if the incident_face is in v1_faces (and is not the unbounded
         # face) then return it. Remember: We know for a fact that this face exists and is distinct
-        # (because the diagonal v1v2 is valid)
+        # (because the diagonal v1v2 is valid). In a polygon with holes v1 and v2 may have two faces in common, then
+        # the face is the one whose corner at v2 contains the direction of the diagonal.
+        common_face = None
         hedge = v2.incident_edge
         while True:
             if hedge.incident_face in v1_faces and hedge.incident_face.outer_component is not None:
-                return hedge.incident_face
+                if in_corner(hedge.twin.origin.coordinates, v2.coordinates, hedge.prev.origin.coordinates,
+                             v1.coordinates):
+                    return hedge.incident_face
+                common_face = common_face or hedge.incident_face
             hedge = hedge.prev.twin
+            if hedge is v2.incident_edge:
+                return common_face
+
+
+def in_corner(a, o, b, p):
+    """ Whether the direction from o to p lies strictly inside the corner that goes counter-clockwise from the
+    direction oa to the direction ob """
+    oa_cross_op = (a[0] - o[0]) * (p[1] - o[1]) - (a[1] - o[1]) * (p[0] - o[0])
+    op_cross_ob = (p[0] - o[0]) * (b[1] - o[1]) - (p[1] - o[1]) * (b[0] - o[0])
+    if (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0]) > 0:  # convex corner
+        return oa_cross_op > 0 and op_cross_ob > 0
+    return oa_cross_op > 0 or op_cross_ob > 0  # reflex corner
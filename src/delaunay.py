@@ -0,0 +1,63 @@
+from .triangulation import triangulate_polygon
+from math import atan2, pi
+
+""" Constrained Delaunay triangulation of a simple polygon by edge flips (Lawson, 1977).
+
+The monotone triangulation (triangulation.py) produces fans of slivers (long and thin triangles). A diagonal uv
+shared by the triangles uva and vub is 'illegal' when the angles at a and b add up to more than 180 degrees (b lies
+inside the circumcircle of uva). Flipping it to ab increases the smallest angle of the two triangles. Diagonals are
+flipped until no illegal one is left. The polygon edges are never flipped, thus the result is the constrained
+Delaunay triangulation of the polygon, which maximizes the minimum angle over all its triangulations.
+
+Fewer slivers mean shorter point location walks and sleeves with fewer portals.
+"""
+
+
+def opposite_angle(hedge):
+    """ The angle of the triangle of hedge at the vertex opposite to hedge """
+    o = hedge.prev.origin.coordinates
+    a = hedge.origin.coordinates
+    b = hedge.twin.origin.coordinates
+    cross = (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+    dot = (a[0] - o[0]) * (b[0] - o[0]) + (a[1] - o[1]) * (b[1] - o[1])
+    return atan2(abs(cross), dot)
+
+
+def is_illegal(hedge):
+    """ Whether the diagonal hedge violates the Delaunay (empty circumcircle) condition. (Cocircular points are legal,
+    so no diagonal is ever flipped back and forth) """
+    if hedge.incident_face.outer_component is None or hedge.twin.incident_face.outer_component is None:
+        return False  # polygon edge (constrained)
+    return opposite_angle(hedge) + opposite_angle(hedge.twin) > pi * (1 + 1e-12)
+
+
+def delaunay_flip(triangulated_dcel):
+    """ Flip the diagonals of a triangulated DCEL until it is the constrained Delaunay triangulation of the polygon
+
+    Keyword arguments:
+    :param triangulated_dcel : a triangulated DCEL (modified in place)
+    :returns The number of flips
+    """
+    flips = 0
+    stack = list(triangulated_dcel.hedges)
+    while stack:
+        hedge = stack.pop()
+        if not is_illegal(hedge):
+            continue
+        # After the flip the four edges of the quadrilateral may have become illegal
+        stack.extend((hedge.next, hedge.prev, hedge.twin.next, hedge.twin.prev))
+        triangulated_dcel.flip_diagonal(hedge)
+        flips += 1
+    return flips
+
+
+def delaunay_triangulate_polygon(poly):
+    """ Constrained Delaunay triangulation of a simple polygon (monotone triangulation followed by edge flips)
+
+    Keyword arguments:
+    :param poly: A simple polygon to be triangulated
+    :return: the DCEL storing the triangulated polygon
+    """
+    triangulated_dcel = triangulate_polygon(poly)
+    delaunay_flip(triangulated_dcel)
+    return triangulated_dcel
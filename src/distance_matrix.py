@@ -0,0 +1,87 @@
+from .shortest_path_map import ShortestPathMap
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import os
+
+""" Many-to-many geodesic distance matrix.
+
+All sources and targets are located in one batch (TriangleMesh.locate_points). Then, for every source, a single
+ShortestPathMap is built, so the sleeve and funnel work is shared by all the targets of that source: each target
+costs one final funnel step. Sources (rows of the matrix) are independent, thus they are distributed to a pool of
+processes. The mesh and the targets are sent once to every worker process (see _init_worker) and not once per row.
+"""
+
+_worker_state = None  # (mesh, targets, t_targets, return_paths) of a worker process (set by _init_worker)
+
+
+def _init_worker(mesh, targets, t_targets, return_paths):
+    global _worker_state
+    _worker_state = (mesh, targets, t_targets, return_paths)
+
+
+def _worker_distance_row(source, t_source):
+    return _distance_row(source, t_source, *_worker_state)
+
+
+def _distance_row(source, t_source, mesh, targets, t_targets, return_paths):
+    """ Distances (and optionally paths) from one source to all targets.
+
+    Keyword arguments:
+    :param source : coordinates (x,y) of the source
+    :param t_source : triangle ID of the source (-1 if outside the mesh)
+    :param mesh : the TriangleMesh
+    :param targets : list of target coordinates
+    :param t_targets : list of the triangle IDs of the targets (-1 if outside the mesh)
+    :param return_paths : whether the paths are also returned
+    :returns (row, paths) where row is a NumPy array (nan for unreachable targets) and paths a list (or None)
+    """
+    row = np.full(len(targets), np.nan)
+    paths = [None] * len(targets) if return_paths else None
+    if t_source == -1:
+        return row, paths
+
+    spm = ShortestPathMap(mesh, source, source_triangle=t_source)
+    for j, (target, t_target) in enumerate(zip(targets, t_targets)):
+        if t_target == -1:
+            continue
+        d = spm.distance(target, t_target)
+        if d is not None:
+            row[j] = d
+            if return_paths:
+                paths[j] = spm.shortest_path(target, t_target)
+    return row, paths
+
+
+def distance_matrix(mesh, sources, targets, return_paths=False, processes=None):
+    """ N x M matrix of the geodesic (inside the polygon) distances between sources and targets
+
+    Keyword arguments:
+    :param mesh : the TriangleMesh of the polygon that contains the points
+    :param sources : N source points (sequence of (x,y) or array of shape (N, 2))
+    :param targets : M target points (sequence of (x,y) or array of shape (M, 2))
+    :param return_paths : also return the shortest paths
+    :param processes : number of worker processes (None for os.cpu_count(), 1 to run in this process)
+    :returns The NumPy distance matrix (nan where a point lies outside the mesh). If return_paths is True a tuple
+             (matrix, paths) is returned, where paths[i][j] is the path from sources[i] to targets[j] (or None)
+    """
+    sources = [tuple(map(float, p)) for p in sources]
+    targets = [tuple(map(float, p)) for p in targets]
+
+    # Locate all the points in one batch
+    located = mesh.locate_points(sources + targets)
+    t_sources = located[:len(sources)].tolist()
+    t_targets = located[len(sources):].tolist()
+
+    if processes == 1 or len(sources) <= 1:
+        rows = [_distance_row(s, t_s, mesh, targets, t_targets, return_paths) for s, t_s in zip(sources, t_sources)]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(mesh, targets, t_targets, return_paths)) as executor:
+            workers = processes or os.cpu_count() or 1
+            rows = list(executor.map(_worker_distance_row, sources, t_sources,
+                                     chunksize=max(1, len(sources) // (4 * workers))))
+
+    matrix = np.vstack([row for row, _ in rows]) if rows else np.empty((0, len(targets)))
+    if return_paths:
+        return matrix, [paths for _, paths in rows]
+    return matrix
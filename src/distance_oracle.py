@@ -0,0 +1,169 @@
+from .shortest_path_map import ShortestPathMap
+from .triangle_mesh import TriangleGrid
+from collections import OrderedDict
+from math import dist
+import numpy as np
+
+""" Precomputed geodesic distance oracle (hub labels over the reflex vertices of a polygon).
+
+A shortest path inside a simple polygon is either the straight segment pq or it bends only at reflex vertices. If
+u is its first bend and v its last one, then d(p, q) = |pu| + d(u, v) + |vq|, where u is visible from p and v is
+visible from q. The oracle is built in a preprocessing stage:
+
+1. hubs: the reflex vertices of the polygon
+2. the hub distance matrix: d(u, v) for every pair of hubs (one ShortestPathMap per hub)
+3. the labels: for every triangle t, the hubs that see (a part of) t, together with the 'visibility window' of the
+   hub inside t. A hub u sees a part of t exactly when u is the apex of the funnel with which t is entered in the
+   shortest path map of u, and the visible part of t is the wedge between the first edges of the two funnel chains.
+
+A distance query then locates p and q, keeps the hubs of their labels whose windows contain them, and returns
+min(|pu| + d(u, v) + |vq|) over these candidates (or |pq| if q is visible from p). No DualGraph or funnel is run.
+
+Knob: max_rows is the number of rows of the hub distance matrix that are kept in memory. With max_rows=None the
+whole oracle is preprocessed: all rows are stored (memory ~ 8 bytes * hubs^2) and the labels are built (fastest
+queries). With max_rows set there is no preprocessing at all. The matrix is an LRU cache of rows, a query that needs
+a missing row computes it with a ShortestPathMap, and the labels are replaced by segment walks from the query points
+to the hubs (less memory and no build time, slower queries). A query only needs the rows of the hubs on the side (p
+or q) that sees fewer of them, since d(u, v) = d(v, u).
+"""
+
+
+class DistanceOracle:
+    """ Geodesic distance oracle of the polygon of a TriangleMesh (the polygon must be simple)
+
+    Attributes:
+    :param mesh : the TriangleMesh
+    :param hubs : indices (in mesh.vertices) of the hub vertices (the reflex vertices)
+    :param labels : labels[t] = (hub positions, left window points, right window points) as NumPy arrays (None if
+                    max_rows is set)
+    :param max_rows : maximum number of hub distance matrix rows kept in memory (None for all)
+    :param grid : TriangleGrid of the mesh for the point location of the queries
+    """
+
+    def __init__(self, mesh, max_rows=None):
+        self.mesh = mesh
+        self.hubs = mesh.reflex_vertices()
+        self.max_rows = max_rows
+        self._hub_coordinates = np.array([mesh.vertices[h] for h in self.hubs], dtype=float).reshape(-1, 2)
+        self._rows = OrderedDict()  # Key: hub position, Value: NumPy row of the hub distance matrix
+        self._hub_triangle = self._incident_triangles()  # Key: vertex index, Value: a triangle ID incident to it
+        self.grid = TriangleGrid(mesh)
+        self.labels = None
+        if max_rows is None:
+            self.build()
+
+    def build(self):
+        """ The preprocessing stage: one ShortestPathMap per hub gives a row of the hub distance matrix and the
+        visibility windows of the hub """
+        mesh = self.mesh
+        nan = (np.nan, np.nan)
+
+        # Key: triangle ID, Value: lists of hub positions, left window points, right window points
+        label_lists = [([], [], []) for _ in range(len(mesh))]
+        for i, h in enumerate(self.hubs):
+            u = mesh.vertices[h]
+            spm = ShortestPathMap(mesh, u, source_triangle=self._hub_triangle[h])
+            self._store_row(i, self._row_from_map(spm))
+            for t, (funnel, apex) in spm.funnels.items():
+                if funnel[apex] != u:  # t is not visible from u at all
+                    continue
+                hubs, lefts, rights = label_lists[t]
+                hubs.append(i)
+                lefts.append(funnel[apex - 1] if apex > 0 else nan)
+                rights.append(funnel[apex + 1] if apex < len(funnel) - 1 else nan)
+
+        self.labels = [(np.array(hubs, dtype=np.int64), np.array(lefts, dtype=float).reshape(-1, 2),
+                        np.array(rights, dtype=float).reshape(-1, 2)) for hubs, lefts, rights in label_lists]
+
+    def _incident_triangles(self):
+        """ Returns a dictionary with one triangle for every vertex index (Key: vertex index, Value: triangle ID) """
+        incident = dict()
+        for t, tri in enumerate(self.mesh.triangles):
+            for i in tri:
+                incident.setdefault(i, t)
+        return incident
+
+    def _row_from_map(self, spm):
+        """ Distances from the source of a ShortestPathMap (a hub) to all hubs """
+        return np.array([spm.distances[self.mesh.vertices[h]] for h in self.hubs], dtype=float)
+
+    def _store_row(self, i, row):
+        self._rows[i] = row
+        self._rows.move_to_end(i)
+        if self.max_rows is not None and len(self._rows) > self.max_rows:
+            self._rows.popitem(last=False)
+
+    def _row(self, i):
+        """ Row i of the hub distance matrix (recomputed with a ShortestPathMap if it is not kept in memory) """
+        if i in self._rows:
+            self._rows.move_to_end(i)
+            return self._rows[i]
+        h = self.hubs[i]
+        spm = ShortestPathMap(self.mesh, self.mesh.vertices[h], source_triangle=self._hub_triangle[h])
+        row = self._row_from_map(spm)
+        self._store_row(i, row)
+        return row
+
+    def _visible_hubs(self, p, t):
+        """ The hubs of the label of triangle t whose visibility window contains p, and their distances to p.
+        (Without labels, the hubs that are visible from p by a segment walk) """
+        px, py = p
+        if self.labels is None:
+            hubs = np.flatnonzero(self.mesh.are_visible([(p, u) for u in self._hub_coordinates.tolist()],
+                                                        np.full(len(self.hubs), t)))
+            return hubs, np.hypot(self._hub_coordinates[hubs, 0] - px, self._hub_coordinates[hubs, 1] - py)
+        hubs, lefts, rights = self.labels[t]
+        u = self._hub_coordinates[hubs]
+        # p must not lie strictly left of the ray u -> left point, nor strictly right of the ray u -> right point.
+        # (nan window points mean that there is no restriction on that side; nan comparisons are False)
+        left_cross = (lefts[:, 0] - u[:, 0]) * (py - u[:, 1]) - (lefts[:, 1] - u[:, 1]) * (px - u[:, 0])
+        right_cross = (rights[:, 0] - u[:, 0]) * (py - u[:, 1]) - (rights[:, 1] - u[:, 1]) * (px - u[:, 0])
+        visible = ~(left_cross > 0) & ~(right_cross < 0)
+        hubs = hubs[visible]
+        return hubs, np.hypot(self._hub_coordinates[hubs, 0] - px, self._hub_coordinates[hubs, 1] - py)
+
+    def distance(self, p, q, t_p=None, t_q=None):
+        """ Geodesic distance between p and q
+
+        Keyword arguments:
+        :param p : coordinates (x,y) of the first point
+        :param q : coordinates (x,y) of the second point
+        :param t_p : ID of the triangle containing p, if already known
+        :param t_q : ID of the triangle containing q, if already known
+        :returns The length of the shortest path from p to q (None if any of the points lies outside the mesh)
+        """
+        if t_p is None or t_q is None:
+            located = self.grid.locate_points([p, q]).tolist()
+            t_p = located[0] if t_p is None else t_p
+            t_q = located[1] if t_q is None else t_q
+        if t_p == -1 or t_q == -1:
+            return None
+        if t_p == t_q or self.mesh.is_visible(p, q, t_p):
+            return dist(p, q)
+
+        hubs_p, d_p = self._visible_hubs(p, t_p)
+        hubs_q, d_q = self._visible_hubs(q, t_q)
+        if len(hubs_q) < len(hubs_p):  # fewer rows to read (or to compute)
+            hubs_p, d_p, hubs_q, d_q = hubs_q, d_q, hubs_p, d_p
+        best = np.inf
+        for i, d_pu in zip(hubs_p.tolist(), d_p.tolist()):
+            best = min(best, d_pu + (self._row(i)[hubs_q] + d_q).min(initial=np.inf))
+        if best == np.inf:  # No candidate survived the (floating point) window tests. Answer without the oracle
+            return ShortestPathMap(self.mesh, p, source_triangle=t_p).distance(q, t_q)
+        return float(best)
+
+    def distances(self, pairs):
+        """ Geodesic distances of a batch of (p, q) pairs. All the points are located in one batch.
+
+        Keyword arguments:
+        :param pairs : sequence of (p, q) coordinate pairs
+        :returns NumPy array with the distance of every pair (nan where a point lies outside the mesh)
+        """
+        points = [p for pair in pairs for p in pair]
+        located = self.grid.locate_points(points).tolist()
+        result = np.full(len(pairs), np.nan)
+        for k, (p, q) in enumerate(pairs):
+            t_p, t_q = located[2 * k], located[2 * k + 1]
+            if t_p != -1 and t_q != -1:
+                result[k] = self.distance(tuple(p), tuple(q), t_p, t_q)
+        return result
@@ -0,0 +1,115 @@
+from .triangulation import triangulate_polygon
+from .triangle_mesh import TriangleMesh
+from shapely.geometry import Polygon, box
+from shapely import unary_union
+import os
+
+""" Routing domains built from several levels of the GSHHS hierarchy.
+
+The GSHHS shapefiles are split by level: L1 is land (continents and islands), L2 the lakes inside L1, L3 the islands
+inside the lakes and L4 the ponds inside those islands. Every polygon of level k > 1 records in 'parent_id' the id of
+the polygon of level k - 1 it lies in. (The polygons cut in two at the antimeridian, e.g. Eurasia, have L1 ids such
+as '0-E' and '0-W' while their lakes have parent_id 0)
+
+land_minus_lakes builds the land of L1 minus the lakes of L2 as a list of polygons with holes. Every polygon is
+triangulated in one pass (holes included, see make_monotone in triangulation.py) and the result is queried as one
+structure, e.g. by BatchRouter.assign_polygons (routing.py), for which a point inside a lake lies in no polygon.
+sea builds the navigable domain of maritime routing: a bounding box minus every L1 land polygon, that is polygons
+whose holes are the islands (and whose exterior follows the coastlines that cross the box). sea_mesh triangulates
+them once into a single TriangleMesh and stores it in a file, so that the routers (router.py) answer sea-route
+queries on the stored mesh without any geometry union per query.
+
+(The dual graph of a polygon with holes has cycles. The routers find their sleeves by a best first search over the
+triangle centroids, see triangle_mesh.py, while ShortestPathMap and DistanceOracle refuse such polygons)
+"""
+
+
+def land_minus_lakes(land, lakes):
+    """ Subtract the lakes (GSHHS L2) from the land polygons (GSHHS L1) they lie in
+
+    Keyword arguments:
+    :param land : GeoDataFrame of the L1 polygons (with an 'id' column)
+    :param lakes : GeoDataFrame of the L2 polygons (with a 'parent_id' column)
+    :returns A list of shapely Polygons with holes, in the order of land. A land polygon is split in several ones only
+             if its lakes touch its coastline (or each other)
+    """
+    # Key: id of a land polygon (as a string), Value: list of the polygons of its lakes
+    lakes_of = dict()
+    for parent_id, lake in zip(lakes['parent_id'].tolist(), lakes.geometry):
+        lakes_of.setdefault(str(parent_id), []).append(lake)
+
+    domain = []
+    for land_id, poly in zip(land['id'].tolist(), land.geometry):
+        land_id = str(land_id)
+        holes = lakes_of.get(land_id)
+        if holes is None and '-' in land_id:  # one of the two halves of a polygon cut at the antimeridian
+            holes = [lake for lake in lakes_of.get(land_id.split('-')[0], []) if poly.contains(lake)]
+        if not holes:
+            domain.append(poly)
+            continue
+        candidate = Polygon(poly.exterior, [hole.exterior for hole in holes])
+        # The holes of a valid polygon may still touch the exterior or each other at single points, which the DCEL
+        # (one Vertex per coordinates) does not support. Then the shapely difference does the job instead
+        if candidate.is_valid and _rings_are_disjoint(candidate):
+            domain.append(candidate)
+        else:
+            domain.extend(_polygons(poly.difference(unary_union(holes))))
+    return domain
+
+
+def sea(land, bbox):
+    """ The sea inside a bounding box: the box minus the land polygons (GSHHS L1)
+
+    Keyword arguments:
+    :param land : GeoDataFrame of the L1 polygons
+    :param bbox : (min_x, min_y, max_x, max_y) of the box
+    :returns A list of shapely Polygons with holes (the islands inside the box)
+    """
+    min_x, min_y, max_x, max_y = bbox
+    coast = unary_union(land.geometry[land.geometry.intersects(box(*bbox))].tolist())
+    # An island with a vertex exactly on the side of the box would be a hole that touches the exterior, which the
+    # DCEL (one Vertex per coordinates) does not support. Then the box is widened by a negligible margin
+    margin = 0.0
+    for _ in range(4):
+        region = box(min_x - margin, min_y - margin, max_x + margin, max_y + margin)
+        polygons = _polygons(region.difference(coast))
+        if all(_rings_are_disjoint(poly) for poly in polygons):
+            return polygons
+        margin = 1e-9 * max(max_x - min_x, max_y - min_y, 1.0) if not margin else 10 * margin
+    raise ValueError('The land polygons touch each other inside the box, the sea has rings that share vertices')
+
+
+def sea_mesh(land, bbox, path=None):
+    """ Triangulation of the sea inside a bounding box, built once and stored
+
+    Keyword arguments:
+    :param land : GeoDataFrame of the L1 polygons
+    :param bbox : (min_x, min_y, max_x, max_y) of the box
+    :param path : .npz file of the mesh (see TriangleMesh.save). It is read if it exists, otherwise the mesh is built
+                  and written to it. (None to build the mesh without storing it)
+    :returns The TriangleMesh of all the sea polygons of the box (one connected component per polygon)
+    """
+    if path is not None and os.path.exists(path):
+        return TriangleMesh.load(path)
+    mesh = TriangleMesh.concatenate(TriangleMesh.from_dcel(triangulate_polygon(poly)) for poly in sea(land, bbox))
+    if path is not None:
+        mesh.save(path)
+    return mesh
+
+
+def _rings_are_disjoint(poly):
+    """ Whether the exterior and the holes of a polygon share no vertex """
+    seen = set()
+    for ring in [poly.exterior, *poly.interiors]:
+        coordinates = set(ring.coords)
+        if seen & coordinates:
+            return False
+        seen |= coordinates
+    return True
+
+
+def _polygons(geometry):
+    """ The polygons of a (multi)polygon or geometry collection """
+    if geometry.geom_type == 'Polygon':
+        return [geometry] if not geometry.is_empty else []
+    return [part for g in getattr(geometry, 'geoms', []) for part in _polygons(g)]
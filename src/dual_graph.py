@@ -24,7 +24,7 @@ class DualGraph:
     Attributes:
     :param triangulated_dcel : a triangulated DCEL
     :param face : the face of the triangulated DCEL which corresponds to the root node of the dual graph
-    :param target_node : The face found for the path finding algorithm
+    :param target_node : The node found by find_node_containing_point (path_to_point does not use it)
     """
 
     def __init__(self, triangulated_dcel, face):
@@ -92,12 +92,13 @@ class DualGraph:
         """
         path = []
         # self.find_node_containing_point(self.root, p) . (Maximum Recursion Error Python)
-        self.find_node_containing_point2(p)
-        tmp_node = self.target_node
+        # The found node is kept in a local variable (not in self.target_node) so that concurrent calls on the same
+        # DualGraph do not interfere with each other
+        tmp_node = self.find_node_containing_point2(p)
         while tmp_node is not None:
-            path.insert(0, tmp_node.face)
+            path.append(tmp_node.face)
             tmp_node = tmp_node.parent
-        self.target_node = None  # reset
+        path.reverse()
         return path
 
     def find_node_containing_point(self, node, p):
@@ -120,10 +121,12 @@ class DualGraph:
     # Iterative counterpart of find_node_containing_point. (Maximum Depth Recursion Python)
     # https://stackoverflow.com/questions/6809402/python-maximum-recursion-depth-exceeded-while-calling-a-python-object
     def find_node_containing_point2(self, p):
-        """ Find the node which stores the face that contains the point. When found we store it at self.target_node
+        """ Find the node which stores the face that contains the point. Unlike find_node_containing_point the
+        result is returned and not stored at self.target_node
 
         Keyword arguments:
         :param p : the query point (tuple with x,y coordinates)
+        :returns The node storing the face that contains p (None if no such node exists)
         """
         queue = deque()
         queue.append(self.root)
@@ -131,10 +134,10 @@ class DualGraph:
         while queue:
             tmp_node = queue.pop()
             if triangle_face_contains_point(tmp_node.face, p):
-                self.target_node = tmp_node
-                return
+                return tmp_node
             for child in tmp_node.children:
                 queue.append(child)
+        return None
 
     @staticmethod
     def find_adjacent_faces(face):
@@ -0,0 +1,129 @@
+from .domain import _polygons, _rings_are_disjoint
+from .triangulation import triangulate_polygon
+from .triangle_mesh import TriangleMesh
+from .router import Router
+from .routing import BatchRouter
+from shapely.geometry import Point, Polygon
+from shapely import STRtree, unary_union
+import numpy as np
+
+""" Coarse-to-fine routing across the resolutions of GSHHS (crude, low, intermediate, high, full).
+
+The same coastline is shipped at several resolutions and every polygon of every resolution records in 'sibling_id'
+the id of the full resolution polygon it was derived from (its ancestor), thus a polygon of the crude set and the
+polygon of the high set that describe the same island share their 'sibling_id'. (The 'id' column is numbered per
+resolution and does not match across resolutions)
+
+A query of the HierarchicalRouter runs in three steps:
+
+1. The sleeve of the query is found on the triangulation of the coarse polygon (few triangles, kept between queries).
+2. The triangles of that sleeve, widened by a margin, make the corridor. It is clipped with the fine polygon of the
+   same ancestor, which gives a small piece of the fine polygon around the coarse route.
+3. Only that piece is triangulated and searched at full resolution.
+
+So a long distance query never triangulates the whole fine polygon. Since the coastlines of the two resolutions
+differ, the corridor is widened (doubling the margin) while the piece does not connect the two endpoints, and the
+whole fine polygon is used as a last resort (e.g. when an endpoint lies on a detail that the coarse polygon lacks).
+The path is the shortest path inside the corridor, a route that bends at fine resolution coastline vertices.
+"""
+
+
+class HierarchicalRouter:
+    """ Shortest paths inside the polygons of a fine resolution, guided by the sleeves of a coarse resolution
+
+    Attributes:
+    :param coarse : GeoDataFrame of the coarse polygons (with a 'sibling_id' column, e.g. GSHHS_c_L1)
+    :param fine : GeoDataFrame of the fine polygons (with a 'sibling_id' column, e.g. GSHHS_h_L1)
+    :param margin : initial width of the corridor around the coarse sleeve (in the units of the coordinates)
+    :param max_widenings : number of times the margin is doubled before the whole fine polygon is used
+    :param coarse_router : BatchRouter of the coarse polygons (it keeps their triangulations)
+    """
+
+    def __init__(self, coarse, fine, margin=0.5, max_widenings=3):
+        self.coarse = coarse
+        self.fine = fine
+        self.margin = margin
+        self.max_widenings = max_widenings
+        self.coarse_router = BatchRouter(coarse.geometry)
+        self._fine_tree = STRtree(fine.geometry.tolist())
+        # Key: ancestor id, Value: indices of the coarse polygons with that ancestor (the halves of a polygon cut at
+        # the antimeridian share it)
+        self._coarse_of = dict()
+        for index, ancestor in enumerate(coarse['sibling_id'].tolist()):
+            self._coarse_of.setdefault(ancestor, []).append(index)
+
+    def fine_polygon(self, p):
+        """ Index of the fine polygon that contains p (None if there is none) """
+        found = self._fine_tree.query(Point(p), predicate='within')
+        return int(found[0]) if len(found) else None
+
+    def corridor(self, start, dest):
+        """ The piece of the fine polygon that is searched for the query (start, dest)
+
+        Keyword arguments:
+        :param start : coordinates (x,y) of the starting point
+        :param dest : coordinates (x,y) of the destination point
+        :returns A shapely Polygon that contains start and dest (None if they do not lie in the same fine polygon)
+        """
+        index = self.fine_polygon(start)
+        if index is None or index != self.fine_polygon(dest):
+            return None
+        fine_poly = self.fine.geometry.iloc[index]
+        sleeve_cells = self._coarse_sleeve(self.fine['sibling_id'].iloc[index], start, dest)
+        if sleeve_cells is not None:
+            margin = self.margin
+            for _ in range(self.max_widenings + 1):
+                piece = self._clip(fine_poly, sleeve_cells.buffer(margin), start, dest)
+                if piece is not None:
+                    return piece
+                margin *= 2
+        return fine_poly
+
+    def shortest_path(self, start, dest):
+        """ Shortest path from start to dest inside the corridor of the query
+
+        Keyword arguments:
+        :param start : coordinates (x,y) of the starting point
+        :param dest : coordinates (x,y) of the destination point
+        :returns The path as a list of coordinates (None if start and dest do not lie in the same fine polygon)
+        """
+        piece = self.corridor(start, dest)
+        if piece is None:
+            return None
+        return Router(TriangleMesh.from_dcel(triangulate_polygon(piece)), cache_size=0).shortest_path(start, dest)
+
+    def _coarse_sleeve(self, ancestor, start, dest):
+        """ Union of the coarse triangles of the sleeve from start to dest (None if the coarse polygons of the ancestor
+        do not give one). Endpoints that lie outside the coarse polygon are moved to its closest point """
+        candidates = self._coarse_of.get(ancestor, [])
+        # Of several polygons with the same ancestor (e.g. both halves of Antarctica) the closest ones come first
+        for index in sorted(candidates, key=lambda k: self.coarse.geometry.iloc[k].distance(Point(start))):
+            coarse_poly = self.coarse.geometry.iloc[index]
+            mesh, grid = self.coarse_router.mesh(index)
+            located = grid.locate_points([_closest_point(coarse_poly, p) for p in (start, dest)]).tolist()
+            if -1 in located:
+                continue
+            sleeve = mesh.find_sleeve(*located)
+            if sleeve is not None:
+                return unary_union([Polygon(mesh.triangle_coordinates(t)) for t in sleeve])
+        return None
+
+    @staticmethod
+    def _clip(fine_poly, region, start, dest):
+        """ The part of fine_poly inside region that contains start and dest (None if they are not connected in it or
+        if that part cannot be triangulated, i.e. its rings share vertices) """
+        for piece in _polygons(fine_poly.intersection(region)):
+            if piece.covers(Point(start)):
+                if piece.covers(Point(dest)) and _rings_are_disjoint(piece):
+                    return piece
+                return None
+        return None
+
+
+def _closest_point(poly, p):
+    """ p if it lies in poly, otherwise the closest vertex of the exterior of poly (a vertex of the triangulation,
+    which a point projected onto an edge is not always, by rounding) """
+    if poly.covers(Point(p)):
+        return p
+    ring = np.asarray(poly.exterior.coords)
+    return tuple(ring[np.argmin(np.hypot(ring[:, 0] - p[0], ring[:, 1] - p[1]))].tolist())
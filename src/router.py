@@ -0,0 +1,166 @@
+from .simple_funnel import exact_funnel_shortest_path_from_portals
+from .shortest_path_map import ShortestPathMap
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+""" Reentrant shortest path queries.
+
+A Router answers shortest path queries over a read-only TriangleMesh (triangle_mesh.py). Contrary to the DualGraph
+pipeline of main.py, every query keeps all of its state (located triangles, sleeve, portals, funnel) in local
+variables, thus one Router (and one mesh) can serve any number of concurrent queries.
+
+Traffic usually concentrates on a few origin/destination areas (harbours, straits). The sleeve and the portals of a
+query only depend on the triangles of its endpoints, thus they are kept in an LRU SleeveCache keyed by
+(start triangle, end triangle) and only the funnel, which depends on the endpoints themselves, is run per query.
+"""
+
+SleeveCacheInfo = namedtuple('SleeveCacheInfo', ['hits', 'misses', 'maxsize', 'currsize', 'hit_rate'])
+
+
+class SleeveCache:
+    """ Thread-safe LRU cache of sleeves and portals of a TriangleMesh, keyed by (start triangle, end triangle)
+
+    Attributes:
+    :param mesh : the TriangleMesh
+    :param maxsize : maximum number of cached sleeves (0 disables caching)
+    :param search_budget : maximum number of triangles expanded by the sleeve search (None for no limit)
+    :param hits : number of lookups answered from the cache
+    :param misses : number of lookups that computed the sleeve
+    """
+
+    def __init__(self, mesh, maxsize=1024, search_budget=None):
+        self.mesh = mesh
+        self.maxsize = maxsize
+        self.search_budget = search_budget
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # Key: (t_start, t_end), Value: (sleeve, bot_portals, top_portals) or None
+        self._lock = Lock()
+
+    def get(self, t_start, t_end):
+        """ Sleeve and portals from triangle t_start to triangle t_end
+
+        Keyword arguments:
+        :param t_start : the ID of the first triangle
+        :param t_end : the ID of the last triangle
+        :returns (sleeve, bot_portals, top_portals) as tuples (None if t_end is unreachable from t_start, or not reached
+                 within the search budget)
+        """
+        key = (t_start, t_end)
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+
+        # Computed outside of the lock, so that concurrent misses do not wait for each other
+        sleeve = self.mesh.find_sleeve(t_start, t_end, self.search_budget)
+        entry = None
+        if sleeve is not None:
+            bot_portals, top_portals = self.mesh.portals(sleeve)
+            entry = (tuple(sleeve), tuple(bot_portals), tuple(top_portals))
+
+        with self._lock:
+            if self.maxsize > 0:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def info(self):
+        """ Returns the SleeveCacheInfo (hits, misses, maxsize, currsize, hit_rate) of the cache """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return SleeveCacheInfo(self.hits, self.misses, self.maxsize, len(self._entries),
+                                   self.hits / lookups if lookups else 0.0)
+
+    def clear(self):
+        """ Empty the cache and reset the metrics """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class Router:
+    """ Shortest path queries inside the polygon of a TriangleMesh
+
+    Attributes:
+    :param mesh : the read-only TriangleMesh of a triangulated polygon (holes allowed, see find_sleeve in
+                  triangle_mesh.py)
+    :param sleeve_cache : the SleeveCache of the mesh
+    """
+
+    def __init__(self, mesh, cache_size=1024, search_budget=None):
+        self.mesh = mesh
+        self.sleeve_cache = SleeveCache(mesh, cache_size, search_budget)
+
+    def sleeve(self, start, dest):
+        """ Find the 'sleeve' path of triangles from the triangle containing start to the triangle containing dest
+
+        Keyword arguments:
+        :param start : coordinates (x,y) of the starting point
+        :param dest : coordinates (x,y) of the destination point
+        :returns A list of triangle IDs (None if any of the points lies outside the mesh)
+        """
+        t_start = self.mesh.locate_point(start)
+        t_dest = self.mesh.locate_point(dest)
+        if t_start is None or t_dest is None:
+            return None
+        entry = self.sleeve_cache.get(t_start, t_dest)
+        return None if entry is None else list(entry[0])
+
+    def shortest_path(self, start, dest):
+        """ Find the shortest path from start to dest. If the segment from start to dest lies inside the polygon (see
+        TriangleMesh.is_visible) the straight line is returned right away, otherwise the exact funnel of
+        simple_funnel.py is run over the (cached) sleeve.
+
+        Keyword arguments:
+        :param start : coordinates (x,y) of the starting point
+        :param dest : coordinates (x,y) of the destination point
+        :returns The path as a list of coordinates (None if any of the points lies outside the mesh)
+        """
+        t_start = self.mesh.locate_point(start)
+        if t_start is None:
+            return None
+        # Fast path: dest is directly visible from start (the walk also proves that dest lies inside the mesh)
+        if self.mesh.is_visible(start, dest, t_start):
+            return [start] if start == dest else [start, dest]
+        t_dest = self.mesh.locate_point(dest)
+        if t_dest is None:
+            return None
+        entry = self.sleeve_cache.get(t_start, t_dest)
+        if entry is None:
+            return None
+        _, bot_portals, top_portals = entry
+        return exact_funnel_shortest_path_from_portals(bot_portals, top_portals, start, dest)
+
+    def cache_info(self):
+        """ Returns the SleeveCacheInfo (hits, misses, maxsize, currsize, hit_rate) of the sleeve cache """
+        return self.sleeve_cache.info()
+
+    def shortest_paths_from(self, source, dests):
+        """ One-to-all mode. The funnel is run once over the whole mesh from source (see shortest_path_map.py),
+        afterwards every destination costs a point location and a final funnel step.
+
+        Keyword arguments:
+        :param source : coordinates (x,y) of the common starting point
+        :param dests : iterable of destination coordinates (x,y)
+        :returns A list with the shortest path to every destination (None for destinations outside the mesh)
+        """
+        spm = ShortestPathMap(self.mesh, source)
+        return [spm.shortest_path(dest) for dest in dests]
+
+    def shortest_paths(self, pairs, max_workers=None):
+        """ Answer a batch of queries on a pool of threads
+
+        Keyword arguments:
+        :param pairs : iterable of (start, dest) coordinate pairs
+        :param max_workers : number of threads (None for the ThreadPoolExecutor default)
+        :returns A list with the result of shortest_path for every pair, in the order of pairs
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda pair: self.shortest_path(*pair), pairs))
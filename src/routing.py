@@ -0,0 +1,145 @@
+from .triangulation import triangulate_polygon
+from .convex_partition import convex_partition
+from .delaunay import delaunay_flip
+from .simplify import simplify_polygon
+from .triangle_mesh import TriangleMesh, TriangleGrid, sleeve_from_tree
+from .simple_funnel import exact_funnel_shortest_path_from_portals
+from shapely import STRtree, points as shapely_points
+from math import dist
+import numpy as np
+
+""" Batch routing of point pairs over a collection of polygons (e.g. the rows of a GSHHS shapefile).
+
+route_many answers a whole batch of (start, dest) queries at once:
+
+1. Every endpoint is assigned to the polygon that contains it, with one (vectorized) query of an STRtree of the
+   polygons. A pair is routed only if both of its endpoints lie in the same polygon.
+2. For every polygon of the batch the triangulation, TriangleMesh and TriangleGrid are built once (and kept for later
+   batches) and all its endpoints are located with vectorized edge side tests (TriangleGrid.locate_points).
+3. Pairs are grouped by (polygon, start triangle). The dual graph of the mesh is searched once per group (Dijkstra
+   over the triangle centroids, stopped once the end triangles of the group are reached, see
+   TriangleMesh.sleeve_tree), so the sleeve of every pair of the group is a walk up the parent pointers of the search.
+4. The (exact) funnel is run for every pair and the length of the path is computed.
+"""
+
+
+def path_length(path):
+    """ Length of a path given as a list of coordinates """
+    return sum(dist(a, b) for a, b in zip(path[:-1], path[1:]))
+
+
+class BatchRouter:
+    """ Shortest path queries in batches, over a collection of polygons. The per-polygon structures are built the
+    first time a polygon is met and are reused by every later batch.
+
+    Attributes:
+    :param polygons : list of shapely Polygons
+    :param convex_cells : route over the cells of a convex partition instead of triangles (see convex_partition.py)
+    :param delaunay : refine the triangulations with Delaunay edge flips (see delaunay.py)
+    :param search_budget : maximum number of triangles expanded by the sleeve search of a start triangle (None for no
+                           limit, see TriangleMesh.sleeve_tree). The pairs whose sleeve is not found get no path
+    :param tolerance : simplify the polygons with this tolerance before their triangulation (None to keep them as they
+                       are, see simplify.py). The polygons are still assigned to the points by their original shape,
+                       so an endpoint that lies outside the simplified polygon (near the coast) gets no path
+    :param meshes : Key: polygon index, Value: (TriangleMesh, TriangleGrid) of the polygon (simplified with tolerance,
+                    a BatchRouter per tolerance keeps the triangulations of every tolerance apart)
+    """
+
+    def __init__(self, polygons, convex_cells=False, delaunay=False, search_budget=None, tolerance=None):
+        self.polygons = list(polygons)
+        self.convex_cells = convex_cells
+        self.delaunay = delaunay
+        self.search_budget = search_budget
+        self.tolerance = tolerance
+        self.meshes = dict()
+        self._tree = STRtree(self.polygons)
+
+    def mesh(self, index):
+        """ Returns the (TriangleMesh, TriangleGrid) of polygon index (triangulated on first use) """
+        if index not in self.meshes:
+            poly = self.polygons[index]
+            dcel = triangulate_polygon(poly if self.tolerance is None else simplify_polygon(poly, self.tolerance))
+            if self.delaunay:
+                delaunay_flip(dcel)
+            if self.convex_cells:
+                dcel = convex_partition(dcel)
+            mesh = TriangleMesh.from_dcel(dcel)
+            self.meshes[index] = (mesh, TriangleGrid(mesh))
+        return self.meshes[index]
+
+    def assign_polygons(self, points):
+        """ Find the polygon that contains every point
+
+        Keyword arguments:
+        :param points : array of shape (n, 2) of point coordinates
+        :returns NumPy int array with the polygon index of every point (-1 for points outside all polygons)
+        """
+        result = np.full(len(points), -1, dtype=np.int64)
+        if not len(points) or not self.polygons:
+            return result
+        point_ids, polygon_ids = self._tree.query(shapely_points(points), predicate='within')
+        # (Nested polygons are not expected, lakes should be holes of the land, see domain.py. The first match is kept)
+        result[point_ids[::-1]] = polygon_ids[::-1]
+        return result
+
+    def route_many(self, pairs):
+        """ Shortest paths (and their lengths) of a batch of (start, dest) pairs
+
+        Keyword arguments:
+        :param pairs : sequence of (start, dest) coordinate pairs (or array of shape (n, 2, 2))
+        :returns (paths, lengths) in the order of pairs. paths is a list with the path of every pair as a list of
+                 coordinates (None if the endpoints do not lie in the same polygon) and lengths a NumPy array (nan for
+                 the pairs without a path)
+        """
+        coordinates = np.asarray(pairs, dtype=float).reshape(-1, 2)
+        n = len(coordinates) // 2
+        paths = [None] * n
+        lengths = np.full(n, np.nan)
+        if not n:
+            return paths, lengths
+
+        polygon_of = self.assign_polygons(coordinates).reshape(n, 2)
+        routable = np.flatnonzero((polygon_of[:, 0] != -1) & (polygon_of[:, 0] == polygon_of[:, 1]))
+
+        # Locate the endpoints of all the routable pairs of every polygon in one batch
+        triangle_of = np.full((n, 2), -1, dtype=np.int64)
+        for index in np.unique(polygon_of[routable, 0]).tolist():
+            members = routable[polygon_of[routable, 0] == index]
+            _, grid = self.mesh(index)
+            triangle_of[members] = grid.locate_points(coordinates.reshape(n, 2, 2)[members]).reshape(-1, 2)
+
+        # Group the pairs by (polygon, start triangle) and share one search of the dual graph per group
+        routable = routable[(triangle_of[routable] != -1).all(axis=1)]
+        keys = polygon_of[routable, 0] * (1 + triangle_of[:, 0].max(initial=0)) + triangle_of[routable, 0]
+        order = routable[np.argsort(keys, kind='stable')]
+        boundaries = np.flatnonzero(np.diff(np.sort(keys, kind='stable'))) + 1
+        for group in np.split(order, boundaries):
+            if not len(group):
+                continue
+            mesh, _ = self.mesh(int(polygon_of[group[0], 0]))
+            parent = mesh.sleeve_tree(int(triangle_of[group[0], 0]), triangle_of[group, 1].tolist(), self.search_budget)
+            for k in group.tolist():
+                sleeve = sleeve_from_tree(parent, int(triangle_of[k, 1]))
+                if sleeve is None:
+                    continue
+                start = tuple(coordinates[2 * k].tolist())
+                dest = tuple(coordinates[2 * k + 1].tolist())
+                bot_portals, top_portals = mesh.portals(sleeve)
+                paths[k] = exact_funnel_shortest_path_from_portals(bot_portals, top_portals, start, dest)
+                lengths[k] = path_length(paths[k])
+        return paths, lengths
+
+
+def route_many(polygons, pairs, convex_cells=False, delaunay=False, tolerance=None):
+    """ Shortest paths (and their lengths) of a batch of (start, dest) pairs over a collection of polygons. (Use a
+    BatchRouter directly to keep the triangulations between batches)
+
+    Keyword arguments:
+    :param polygons : sequence of shapely Polygons (e.g. the geometry column of a GeoDataFrame)
+    :param pairs : sequence of (start, dest) coordinate pairs (or array of shape (n, 2, 2))
+    :param convex_cells : route over the cells of a convex partition instead of triangles
+    :param delaunay : refine the triangulations by Delaunay edge flips (before the convex partition, if any)
+    :param tolerance : simplify the polygons with this tolerance before their triangulation (None to keep them)
+    :returns (paths, lengths), see BatchRouter.route_many
+    """
+    return BatchRouter(polygons, convex_cells, delaunay, tolerance=tolerance).route_many(pairs)
@@ -0,0 +1,133 @@
+from .simple_funnel import funnel_add_left, funnel_add_right
+from collections import deque
+from math import dist
+
+""" Single-source shortest path tree / shortest path map.
+
+Given a fixed source point, the funnel algorithm is run once over the whole dual tree of a TriangleMesh (instead of
+once per sleeve). Every triangle records the funnel with which it is entered: the apex and the two concave chains
+that end at the endpoints of the portal (diagonal) through which the triangle was reached. Every polygon vertex
+records its predecessor in the shortest path tree and its geodesic distance from the source.
+
+A query for a destination inside triangle t is then a lookup of the funnel of t plus one final funnel step, that
+is, finding the funnel vertex from which the destination is directly visible.
+
+The funnel is the deque of the exact (Lee and Preparata) funnel of simple_funnel.py.
+"""
+
+
+class ShortestPathMap:
+    """ Shortest path map of a source point inside the polygon of a TriangleMesh. (The dual graph of the mesh must be
+    a tree, i.e. the polygon must be simple)
+
+    Attributes:
+    :param mesh : the TriangleMesh
+    :param source : coordinates (x,y) of the source point
+    :param source_triangle : ID of the triangle containing the source (None if the source is outside the mesh)
+    :param funnels : Key: triangle ID, Value: (funnel, apex) with which the triangle is entered (funnel is a tuple)
+    :param pred : Key: vertex coordinates, Value: predecessor in the shortest path tree (None for the source)
+    :param distances : Key: vertex coordinates, Value: geodesic distance from the source
+    """
+
+    def __init__(self, mesh, source, source_triangle=None):
+        if mesh.holes:
+            raise ValueError(f'The dual graph of a polygon with holes is not a tree ({mesh.holes} holes)')
+        self.mesh = mesh
+        self.source = source
+        self.source_triangle = mesh.locate_point(source) if source_triangle is None else source_triangle
+        self.funnels = dict()
+        self.pred = {source: None}
+        self.distances = {source: 0.0}
+        if self.source_triangle is not None:
+            self.build()
+
+    def build(self):
+        """ Run the funnel algorithm over the whole dual tree, starting from the triangle of the source """
+        mesh = self.mesh
+        self.funnels[self.source_triangle] = ((self.source,), 0)
+
+        # Iterative depth first traversal (Maximum Recursion Error Python). Each stack entry is a triangle and the
+        # funnel with which it is entered.
+        stack = [(self.source_triangle, deque([self.source]), 0)]
+        while stack:
+            t, funnel, apex = stack.pop()
+            # Vertices of t that do not lie on the portal of any child (e.g. the tip of an 'ear') are reached here
+            for v in mesh.triangle_coordinates(t):
+                if v not in self.pred:
+                    last_step = deque(funnel)
+                    funnel_add_left(last_step, apex, v)
+                    self._reach(v, last_step[1])
+            children = [n for n in mesh.neighbors[t] if n != -1 and n not in self.funnels]
+            for i, child in enumerate(children):
+                # The last child may reuse the funnel of t, all the others need their own copy
+                child_funnel = funnel if i == len(children) - 1 else deque(funnel)
+                bot, top = mesh.shared_edge(t, child)
+                child_apex = apex
+                if top != child_funnel[0]:
+                    child_apex = funnel_add_left(child_funnel, child_apex, top)
+                    self._reach(top, child_funnel[1])
+                if bot != child_funnel[-1]:
+                    child_apex = funnel_add_right(child_funnel, child_apex, bot)
+                    self._reach(bot, child_funnel[-2])
+                self.funnels[child] = (tuple(child_funnel), child_apex)
+                stack.append((child, child_funnel, child_apex))
+
+    def _reach(self, v, pred):
+        """ Record pred as the predecessor of vertex v in the shortest path tree (if v is not already reached) """
+        if v not in self.pred:
+            self.pred[v] = pred
+            self.distances[v] = self.distances[pred] + dist(pred, v)
+
+    def _last_vertex(self, dest, t_dest):
+        """ Find the last vertex of the shortest path from the source to dest, before dest (the final funnel step)
+
+        Keyword arguments:
+        :param dest : coordinates (x,y) of the destination point
+        :param t_dest : ID of the triangle containing dest (None to locate it)
+        :returns The coordinates of that vertex (None if dest is outside the mesh or unreachable)
+        """
+        if t_dest is None:
+            t_dest = self.mesh.locate_point(dest)
+        if t_dest is None or t_dest not in self.funnels:
+            return None
+        if dest in self.pred:  # dest is a vertex of the shortest path tree
+            return self.pred[dest]
+        funnel, apex = self.funnels[t_dest]
+        funnel = deque(funnel)
+        funnel_add_left(funnel, apex, dest)
+        return funnel[1]
+
+    def distance(self, dest, t_dest=None):
+        """ Geodesic distance from the source to dest
+
+        Keyword arguments:
+        :param dest : coordinates (x,y) of the destination point
+        :param t_dest : ID of the triangle containing dest, if already known
+        :returns The length of the shortest path (None if dest is outside the mesh)
+        """
+        if dest in self.distances:
+            return self.distances[dest]
+        u = self._last_vertex(dest, t_dest)
+        if u is None:
+            return None
+        return self.distances[u] + dist(u, dest)
+
+    def shortest_path(self, dest, t_dest=None):
+        """ Shortest path from the source to dest
+
+        Keyword arguments:
+        :param dest : coordinates (x,y) of the destination point
+        :param t_dest : ID of the triangle containing dest, if already known
+        :returns The path as a list of coordinates (None if dest is outside the mesh)
+        """
+        if dest == self.source:
+            return [self.source]
+        u = self._last_vertex(dest, t_dest)
+        if u is None:
+            return None
+        path = [dest]
+        while u is not None:
+            path.append(u)
+            u = self.pred[u]
+        path.reverse()
+        return path
@@ -1,11 +1,23 @@
-from numpy import cross, array
-from scipy.spatial import distance
+from collections import deque
+from math import dist
 
 """ Simple Funnel Algorithm : http://digestingduck.blogspot.com/2010/03/simple-stupid-funnel-algorithm.html
 Given a list of consecutive triangles (adjacent triangles share a diagonal and for each triangle there can be at most
 2 neighbors - also called 'sleeve') , find the shortest path from a point in the first triangle to a point in the
 last triangle. This list of triangles will be given to us as a list of faces (each face corresponds to a triangle)
 in the correct order. 
+
+Two implementations are offered side by side:
+
+funnel_shortest_path : the original 'simple stupid funnel' scan. It restarts the scan from the new apex whenever the
+                       funnel flips, and it may return a sub-optimal path (see README, Known Issues).
+exact_funnel_shortest_path : the funnel of Lee and Preparata (Euclidean shortest paths in the presence of rectilinear
+                             barriers, 1984). The funnel is kept in a deque and every portal endpoint is pushed and
+                             popped at most once, thus it is exact and O(k) in the length k of the sleeve.
+
+The deque of the exact funnel: funnel[0], ..., funnel[apex - 1] is the left chain (from the left portal endpoint up to
+the apex), funnel[apex] is the apex and funnel[apex + 1], ..., funnel[-1] is the right chain. Left and right are
+considered when moving through the sleeve, thus the left endpoint of a portal is its top and the right one its bot.
 """
 
 
@@ -36,11 +48,27 @@ def find_diagonal_half_edge(f1, f2):
 
 
 def ab_cross_ac(a, b, c):
-    return cross(array(b) - array(a), array(c) - array(a))  # ab x ac
+    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])  # ab x ac
+
 
+def funnel_shortest_path(faces_path, startpoint, endpoint, poly=None):
+    """ Find the (sometimes suboptimal) shortest path from startpoint to endpoint through the sleeve faces_path.
+    (poly is not used and is kept only for backwards compatibility)
 
-def funnel_shortest_path(faces_path, startpoint, endpoint, poly):
+    Keyword arguments:
+    :param faces_path : list of consecutive Faces ('sleeve'). startpoint lies in the first, endpoint in the last one
+    :param startpoint : coordinates (x,y) of the starting point
+    :param endpoint : coordinates (x,y) of the destination point
+    :returns The path as a list of coordinates from startpoint to endpoint
     """
+    bot_portals, top_portals = find_portals(faces_path)
+    return funnel_shortest_path_from_portals(bot_portals, top_portals, startpoint, endpoint)
+
+
+def funnel_shortest_path_from_portals(bot_portals, top_portals, startpoint, endpoint):
+    """ Same as funnel_shortest_path but works directly on the portals of the sleeve. All the state of the algorithm
+    is local, so it can be called concurrently. (The given lists are not modified)
+
     Definition of top and bot portals:
     Firstly, a pair of top_portals[i] and bot_portals[i] is a diagonal in the path of adjacent triangles. To this end,
     let's consider a path of adjacent triangles (given as faces) in the triangulated DCEL [f0, f1, f2, ... , f_n].
@@ -56,10 +84,13 @@ def funnel_shortest_path(faces_path, startpoint, endpoint, poly):
 
     path_of_coordinates = []
 
-    bot_portals, top_portals = find_portals(faces_path)
+    # Copies, because the caller's portals must not be modified
+    top_portals = top_portals + [endpoint]
+    bot_portals = bot_portals + [endpoint]
 
-    top_portals.append(endpoint)
-    bot_portals.append(endpoint)
+    # top_runs[i] (bot_runs[i]) is the number of portals right after i that share the top (bot) endpoint of portal i
+    top_runs = consecutive_run_lengths(top_portals)
+    bot_runs = consecutive_run_lengths(bot_portals)
 
     bot_curr_index, top_curr_index = 0, 0
 
@@ -96,8 +127,7 @@ def funnel_shortest_path(faces_path, startpoint, endpoint, poly):
                 path_of_coordinates.append(apex)
 
                 # go to the last diagonal (portal) that has as top endpoint the apex.
-                bot_curr_index = (top_curr_index
-                                  + num_of_consecutive_elements_equal_to_start(top_portals[top_curr_index:]))
+                bot_curr_index = top_curr_index + top_runs[top_curr_index]
                 top_curr_index = bot_curr_index+1
 
                 # reset portal
@@ -120,8 +150,7 @@ def funnel_shortest_path(faces_path, startpoint, endpoint, poly):
                 path_of_coordinates.append(apex)
 
                 # go to the last diagonal (portal) that has as bot endpoint the apex.
-                top_curr_index = (bot_curr_index
-                                  + num_of_consecutive_elements_equal_to_start(bot_portals[bot_curr_index:]))
+                top_curr_index = bot_curr_index + bot_runs[bot_curr_index]
                 bot_curr_index = top_curr_index + 1
 
                 # reset portal
@@ -129,10 +158,10 @@ def funnel_shortest_path(faces_path, startpoint, endpoint, poly):
 
         if stuck:
             # Euclidean distance from bot_current to endpoint
-            d_bot_endpoint = distance.euclidean(bot_portals[bot_curr_index], endpoint)
+            d_bot_endpoint = dist(bot_portals[bot_curr_index], endpoint)
 
             # Euclidean distance from top_current to endpoint
-            d_top_endpoint = distance.euclidean(top_portals[top_curr_index], endpoint)
+            d_top_endpoint = dist(top_portals[top_curr_index], endpoint)
 
             if d_bot_endpoint > d_top_endpoint:  # if current_top is closer to endpoint than current_bot
                 # make current top the new apex
@@ -140,8 +169,7 @@ def funnel_shortest_path(faces_path, startpoint, endpoint, poly):
                 path_of_coordinates.append(apex)
 
                 # go to the last diagonal (portal) that has as top endpoint the apex.
-                bot_curr_index = (top_curr_index
-                                  + num_of_consecutive_elements_equal_to_start(top_portals[top_curr_index:]))
+                bot_curr_index = top_curr_index + top_runs[top_curr_index]
                 top_curr_index = bot_curr_index + 1
             else:
                 # make current bot the new apex
@@ -149,8 +177,7 @@ def funnel_shortest_path(faces_path, startpoint, endpoint, poly):
                 path_of_coordinates.append(apex)
 
                 # go to the last diagonal (portal) that has as bot endpoint the apex.
-                top_curr_index = (bot_curr_index
-                                  + num_of_consecutive_elements_equal_to_start(bot_portals[bot_curr_index:]))
+                top_curr_index = bot_curr_index + bot_runs[bot_curr_index]
                 bot_curr_index = top_curr_index + 1
     return path_of_coordinates
 
@@ -172,15 +199,132 @@ def num_of_consecutive_elements_equal_to_start(lst):
     return count
 
 
+def consecutive_run_lengths(lst):
+    """ Returns a list runs where runs[i] is the number of elements equal to lst[i] that are consecutive exactly after
+    index i, that is runs[i] = num_of_consecutive_elements_equal_to_start(lst[i:]) for every i, computed in one
+    backwards pass (no slicing)
+    lst = [1,1,1,3,2] :returns: [2,1,0,0,0]
+    """
+    runs = [0] * len(lst)
+    for i in range(len(lst) - 2, -1, -1):
+        if lst[i + 1] == lst[i]:
+            runs[i] = runs[i + 1] + 1
+    return runs
 
 
+def funnel_add_left(funnel, apex, v):
+    """ Add v as the new left endpoint of the funnel. Afterwards funnel[1] is the predecessor of v in the shortest
+    path tree.
+
+    Keyword arguments:
+    :param funnel : deque of coordinates (modified in place). Only the first two entries (x, y) of every element are
+                    read, so the elements may carry more data
+    :param apex : index of the apex in the funnel
+    :param v : coordinates of the new left endpoint
+    :returns The (possibly new) index of the apex
+    """
+    if funnel[0] == v:  # v already is the left endpoint
+        return apex
+    while len(funnel) > 1:
+        if apex > 0:
+            # Left chain is not empty. The chain must keep turning left (counter-clockwise) at funnel[0]
+            if ab_cross_ac(funnel[1], funnel[0], v) > 0:
+                break
+            funnel.popleft()
+            apex -= 1
+        else:
+            # funnel[0] is the apex. If v lies to the right of the first edge of the right chain, then v is not visible
+            # from the apex and the first vertex of the right chain becomes the new apex
+            if ab_cross_ac(funnel[0], funnel[1], v) >= 0:
+                break
+            funnel.popleft()
+    funnel.appendleft(v)
+    return apex + 1
 
 
+def funnel_add_right(funnel, apex, v):
+    """ Add v as the new right endpoint of the funnel (mirror image of funnel_add_left). Afterwards funnel[-2] is the
+    predecessor of v in the shortest path tree.
 
+    Keyword arguments:
+    :param funnel : deque of coordinates (modified in place). Only the first two entries (x, y) of every element are
+                    read, so the elements may carry more data
+    :param apex : index of the apex in the funnel
+    :param v : coordinates of the new right endpoint
+    :returns The (possibly new) index of the apex
+    """
+    if funnel[-1] == v:  # v already is the right endpoint
+        return apex
+    while len(funnel) > 1:
+        if apex < len(funnel) - 1:
+            # Right chain is not empty. The chain must keep turning right (clockwise) at funnel[-1]
+            if ab_cross_ac(funnel[-2], funnel[-1], v) < 0:
+                break
+            funnel.pop()
+        else:
+            # funnel[-1] is the apex. If v lies to the left of the first edge of the left chain, then the first vertex
+            # of the left chain becomes the new apex
+            if ab_cross_ac(funnel[-1], funnel[-2], v) <= 0:
+                break
+            funnel.pop()
+            apex -= 1
+    funnel.append(v)
+    return apex
 
 
+def exact_funnel_shortest_path(faces_path, startpoint, endpoint):
+    """ Find the (exact) shortest path from startpoint to endpoint through the sleeve faces_path
 
+    Keyword arguments:
+    :param faces_path : list of consecutive Faces ('sleeve'). startpoint lies in the first, endpoint in the last one
+    :param startpoint : coordinates (x,y) of the starting point
+    :param endpoint : coordinates (x,y) of the destination point
+    :returns The path as a list of coordinates from startpoint to endpoint
+    """
+    bot_portals, top_portals = find_portals(faces_path)
+    return exact_funnel_shortest_path_from_portals(bot_portals, top_portals, startpoint, endpoint)
 
 
+def exact_funnel_shortest_path_from_portals(bot_portals, top_portals, startpoint, endpoint):
+    """ Same as exact_funnel_shortest_path but works directly on the portals of the sleeve (see
+    funnel_shortest_path_from_portals for the definition of bot and top portals). All the state of the algorithm is
+    local, so it can be called concurrently.
 
+    Keyword arguments:
+    :param bot_portals : list of the bot endpoints of the portals
+    :param top_portals : list of the top endpoints of the portals
+    :param startpoint : coordinates (x,y) of the starting point
+    :param endpoint : coordinates (x,y) of the destination point
+    :returns The path as a list of coordinates from startpoint to endpoint
+    """
+    # Every push of a vertex to the funnel is a new node of the shortest path tree of startpoint: pred[k] is the
+    # (coordinates, predecessor node) of node k and the funnel holds (x, y, k) triples. The nodes are not keyed by
+    # their coordinates, because a sleeve may reach the same vertex more than once (and a coordinates key would be
+    # overwritten, which can turn the path walk into a cycle)
+    pred = [(startpoint, None)]
+    first_node = {startpoint: 0}  # Key: coordinates, Value: the first node with these coordinates
+    funnel = deque([(*startpoint, 0)])
+    apex = 0
+
+    for bot, top in zip(bot_portals, top_portals):
+        if top != funnel[0][:2]:
+            apex = funnel_add_left(funnel, apex, (*top, len(pred)))
+            first_node.setdefault(top, len(pred))
+            pred.append((top, funnel[1][2]))
+        if bot != funnel[-1][:2]:
+            apex = funnel_add_right(funnel, apex, (*bot, len(pred)))
+            first_node.setdefault(bot, len(pred))
+            pred.append((bot, funnel[-2][2]))
+
+    k = first_node.get(endpoint)
+    if k is None:  # The final funnel step (unless endpoint is a portal endpoint or the startpoint)
+        funnel_add_left(funnel, apex, (*endpoint, len(pred)))
+        k = len(pred)
+        pred.append((endpoint, funnel[1][2]))
 
+    path_of_coordinates = []
+    while k is not None:
+        path_of_coordinates.append(pred[k][0])
+        k = pred[k][1]
+    path_of_coordinates.reverse()
+    return path_of_coordinates
@@ -0,0 +1,154 @@
+from .triangulation import triangulate_polygon
+from shapely.geometry import Polygon
+from shapely import STRtree, linestrings, overlaps
+from time import perf_counter
+import numpy as np
+
+""" Polygon simplification ahead of the triangulation (Douglas and Peucker, 1973).
+
+Many queries tolerate a coastline error of a few hundred meters, while the triangulation time and the length of the
+sleeves grow with the number of vertices. simplify_ring keeps a subset of the vertices of a ring such that every
+removed vertex lies within the tolerance of the simplified ring: the vertex of a span farthest from the segment
+between the kept endpoints of the span is kept as long as it is farther than the tolerance.
+
+Douglas-Peucker alone may make a ring cross itself or another ring (e.g. across a narrow strait), and the
+triangulation needs a simple polygon. simplify_polygon therefore checks the simplified segments for intersections
+(STRtree of the segments) and splits every segment involved in one at the farthest vertex of its span, until no
+two segments intersect. In the worst case this gives back the original polygon, thus the result is always simple
+and its rings keep their nesting.
+
+Points of the original polygon close to its boundary may lie outside the simplified polygon, see BatchRouter
+(routing.py) for how the routers deal with them.
+"""
+
+
+def simplify_ring(coordinates, tolerance):
+    """ Douglas-Peucker simplification of a closed ring
+
+    Keyword arguments:
+    :param coordinates : array of shape (n, 2) of the vertices of the ring (without the closing vertex)
+    :param tolerance : maximum distance of a removed vertex to the simplified ring
+    :returns Sorted NumPy int array of the indices of the kept vertices (at least 3 of them)
+    """
+    ring = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+    n = len(ring)
+    if n <= 3:
+        return np.arange(n)
+    # The ring is split in two spans at vertex 0 and the vertex farthest from it
+    far = int(np.argmax(np.hypot(ring[:, 0] - ring[0, 0], ring[:, 1] - ring[0, 1])))
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, far]] = True
+    stack = [(0, far), (far, n)]  # spans (i, j) of the ring, index n is vertex 0 again
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        distances = _distances(ring[i + 1:j], ring[i], ring[j % n])
+        k = int(np.argmax(distances))
+        if distances[k] > tolerance:
+            k += i + 1
+            keep[k] = True
+            stack.append((i, k))
+            stack.append((k, j))
+    if keep.sum() < 3:  # a ring thinner than the tolerance keeps a triangle
+        keep[_farthest_in_span(ring, 0, far) if far > 1 else _farthest_in_span(ring, far, n)] = True
+    return np.flatnonzero(keep)
+
+
+def simplify_polygon(poly, tolerance):
+    """ Simplify every ring of a polygon (Douglas-Peucker) such that the result is still a simple polygon
+
+    Keyword arguments:
+    :param poly : a shapely Polygon (possibly with holes)
+    :param tolerance : maximum distance of a removed vertex to the simplified boundary
+    :returns The simplified shapely Polygon, with the same number of holes
+    """
+    rings = [np.asarray(ring.coords, dtype=float)[:-1] for ring in [poly.exterior, *poly.interiors]]
+    kept = [set(simplify_ring(ring, tolerance).tolist()) for ring in rings]
+    split = True
+    while split:
+        split = False
+        for r, i, j in _crossing_segments(rings, kept):
+            j = j if j > i else j + len(rings[r])  # the segment that closes the ring
+            if j - i > 1:  # (original edges cannot be split, the segment they cross will be)
+                kept[r].add(_farthest_in_span(rings[r], i, j) % len(rings[r]))
+                split = True
+    return Polygon(*_rings(rings, kept))
+
+
+def simplification_report(polygons, tolerances):
+    """ Vertices and triangulation time of a collection of polygons for several tolerances
+
+    Keyword arguments:
+    :param polygons : sequence of shapely Polygons
+    :param tolerances : sequence of tolerances (0 triangulates the original polygons)
+    :returns A list with one dictionary per tolerance: tolerance, vertices, reduction (fraction of the vertices that
+             are removed), simplification_seconds, triangulation_seconds and speedup (of the triangulation, against
+             tolerance 0, None if 0 is not among the tolerances)
+    """
+    report = []
+    for tolerance in tolerances:
+        t = perf_counter()
+        simplified = [simplify_polygon(poly, tolerance) if tolerance else poly for poly in polygons]
+        simplification = perf_counter() - t
+        t = perf_counter()
+        for poly in simplified:
+            triangulate_polygon(poly)
+        report.append({'tolerance': tolerance, 'vertices': sum(_vertices(poly) for poly in simplified),
+                       'simplification_seconds': simplification, 'triangulation_seconds': perf_counter() - t})
+    original = sum(_vertices(poly) for poly in polygons)
+    baseline = next((entry['triangulation_seconds'] for entry in report if not entry['tolerance']), None)
+    for entry in report:
+        entry['reduction'] = 1 - entry['vertices'] / original if original else 0.0
+        entry['speedup'] = baseline / entry['triangulation_seconds'] if baseline else None
+    return report
+
+
+def _distances(points, a, b):
+    """ Distances of the points (array of shape (n, 2)) to the segment ab """
+    ab = b - a
+    length = ab @ ab
+    if length == 0:
+        return np.hypot(points[:, 0] - a[0], points[:, 1] - a[1])
+    s = np.clip(((points - a) @ ab) / length, 0, 1)
+    closest = a + s[:, None] * ab
+    return np.hypot(points[:, 0] - closest[:, 0], points[:, 1] - closest[:, 1])
+
+
+def _farthest_in_span(ring, i, j):
+    """ Index (possibly >= len(ring)) of the vertex strictly between i and j farthest from the segment of i and j """
+    n = len(ring)
+    inner = np.arange(i + 1, j)
+    return int(inner[np.argmax(_distances(ring[inner % n], ring[i % n], ring[j % n]))])
+
+
+def _rings(rings, kept):
+    """ The coordinates of the simplified exterior and the list of the simplified holes """
+    simplified = [ring[sorted(k)].tolist() for ring, k in zip(rings, kept)]
+    return simplified[0], simplified[1:]
+
+
+def _crossing_segments(rings, kept):
+    """ The simplified segments that intersect another simplified segment (other than at a shared endpoint of two
+    consecutive segments of a ring), as (ring, first kept vertex, last kept vertex) """
+    segments = []  # (ring, i, j)
+    endpoints = []
+    for r, (ring, k) in enumerate(zip(rings, kept)):
+        k = np.array(sorted(k))
+        j = np.roll(k, -1)
+        segments.extend(zip([r] * len(k), k.tolist(), j.tolist()))
+        endpoints.append(np.stack([ring[k], ring[j]], axis=1))
+    lines = linestrings(np.concatenate(endpoints))
+    left, right = STRtree(lines).query(lines, predicate='intersects')
+    pairs = left < right
+    left, right = left[pairs], right[pairs]
+    # Consecutive segments of a ring always meet at their common vertex, they only cross if they overlap
+    ring_of, first, last = np.array(segments).reshape(-1, 3).T
+    consecutive = (ring_of[left] == ring_of[right]) & ((last[left] == first[right]) | (last[right] == first[left]))
+    consecutive[consecutive] = ~overlaps(lines[left[consecutive]], lines[right[consecutive]])
+    return {segments[a] for a in np.concatenate([left[~consecutive], right[~consecutive]]).tolist()}
+
+
+def _vertices(poly):
+    """ Number of vertices of a polygon (all rings) """
+    return sum(len(ring.coords) - 1 for ring in [poly.exterior, *poly.interiors])
@@ -0,0 +1,551 @@
+from math import atan2, dist, pi
+from heapq import heappop, heappush
+import numpy as np
+
+""" Read-only, index based counterpart of a triangulated DCEL.
+
+The DCEL (dcel.py) is a web of mutable Vertex/Hedge/Face objects which is perfect for building a triangulation but
+unsafe to share between concurrent queries. A TriangleMesh flattens a triangulated DCEL into three tuples:
+
+vertices  : vertices[i] are the coordinates (x, y) of vertex i
+triangles : triangles[t] = (i, j, k) are the vertex indices of triangle t in counter-clockwise order
+neighbors : neighbors[t] = (n_0, n_1, n_2) where n_k is the triangle across the edge (triangles[t][k],
+            triangles[t][k+1]) or -1 if that edge lies on the boundary of the polygon
+
+Triangles are identified by their index t (the triangle ID). Nothing in a TriangleMesh is ever modified after
+construction, thus any number of threads can query the same mesh at the same time.
+
+The 'triangles' may also be convex polygons with any number of vertices (the cells of a convex partition, see
+convex_partition.py). Then triangles[t] and neighbors[t] simply have one entry per vertex / edge of cell t. Point
+location, sleeves, portals and visibility work the same way on such cells.
+
+Sleeves are found by a best first search over the dual graph, where moving between adjacent triangles costs the
+distance between their centroids (A* towards a single triangle with the straight line distance as heuristic, see
+find_sleeve, or Dijkstra towards several triangles, see sleeve_tree). When the dual graph is a tree (no holes) the
+sleeve is the only path between the two triangles. With holes the dual graph has cycles and the search returns the
+sleeve of the shortest centroid path: the funnel then gives the shortest path inside that sleeve, which is a good
+route but not always the geodesic (the geodesic may go around a hole on the other side). A search budget (maximum
+number of expanded triangles) bounds the cost of a query on large meshes.
+"""
+
+
+class TriangleMesh:
+    """ Immutable triangle mesh built from a triangulated DCEL
+
+    Attributes:
+    :param vertices : tuple of vertex coordinates (x, y)
+    :param triangles : tuple of (i, j, k) counter-clockwise vertex indices, one per triangle
+    :param neighbors : tuple of (n_0, n_1, n_2) adjacent triangle indices, one per triangle (-1 for no neighbor)
+    :param holes : number of holes of the polygon (0 exactly when the dual graph is a tree, or a forest)
+    :param centroids : tuple of the centroid (x, y) of every triangle (the nodes of the sleeve search)
+    """
+
+    def __init__(self, vertices, triangles, neighbors):
+        self.vertices = tuple(tuple(v) for v in vertices)
+        self.triangles = tuple(tuple(t) for t in triangles)
+        self.neighbors = tuple(tuple(n) for n in neighbors)
+        self.holes = self._count_holes()
+        self.centroids = tuple((sum(self.vertices[i][0] for i in tri) / len(tri),
+                                sum(self.vertices[i][1] for i in tri) / len(tri)) for tri in self.triangles)
+
+    @classmethod
+    def from_dcel(cls, triangulated_dcel):
+        """ Flatten a triangulated DCEL into a TriangleMesh. Triangle IDs are assigned in the order in which the
+        faces are first met in triangulated_dcel.hedges, so the same DCEL always yields the same IDs.
+
+        Keyword arguments:
+        :param triangulated_dcel : a triangulated DCEL (every bounded face is a triangle)
+        :returns The TriangleMesh of the triangulated DCEL
+        """
+        vertex_index = {v: i for i, v in enumerate(triangulated_dcel.vertices)}
+
+        # Key: Face, Value: triangle ID. (dcel.faces is a set, thus we follow the list of half-edges for a stable order)
+        face_index = dict()
+        for hedge in triangulated_dcel.hedges:
+            f = hedge.incident_face
+            if f.outer_component is not None and f not in face_index:
+                face_index[f] = len(face_index)
+
+        triangles = [None] * len(face_index)
+        neighbors = [None] * len(face_index)
+        for f, t in face_index.items():
+            tri = []
+            adj = []
+            tmp_hedge = f.outer_component
+            while True:
+                tri.append(vertex_index[tmp_hedge.origin])
+                # the face across tmp_hedge is the unbounded face when tmp_hedge lies on the polygon boundary
+                adj.append(face_index.get(tmp_hedge.twin.incident_face, -1))
+                tmp_hedge = tmp_hedge.next
+                if tmp_hedge is f.outer_component:
+                    break
+            triangles[t] = tri
+            neighbors[t] = adj
+
+        return cls([v.coordinates for v in triangulated_dcel.vertices], triangles, neighbors)
+
+    @classmethod
+    def concatenate(cls, meshes):
+        """ One TriangleMesh made of several disjoint meshes (e.g. the triangulations of several polygons). The triangle
+        IDs of the k-th mesh follow those of the meshes before it, and no triangle is adjacent to another mesh
+
+        Keyword arguments:
+        :param meshes : iterable of TriangleMesh
+        :returns The TriangleMesh of all the meshes
+        """
+        vertices, triangles, neighbors = [], [], []
+        for mesh in meshes:
+            v0, t0 = len(vertices), len(triangles)
+            vertices.extend(mesh.vertices)
+            triangles.extend(tuple(i + v0 for i in tri) for tri in mesh.triangles)
+            neighbors.extend(tuple(n + t0 if n != -1 else -1 for n in adj) for adj in mesh.neighbors)
+        return cls(vertices, triangles, neighbors)
+
+    def save(self, path):
+        """ Store the mesh in a NumPy .npz file (the cells are flattened, so they may have any number of vertices)
+
+        Keyword arguments:
+        :param path : path of the file
+        """
+        sizes = np.array([len(tri) for tri in self.triangles], dtype=np.int64)
+        np.savez_compressed(path, vertices=np.asarray(self.vertices, dtype=float).reshape(-1, 2),
+                            cell_start=np.concatenate(([0], np.cumsum(sizes))),
+                            triangles=np.array([i for tri in self.triangles for i in tri], dtype=np.int64),
+                            neighbors=np.array([n for adj in self.neighbors for n in adj], dtype=np.int64))
+
+    @classmethod
+    def load(cls, path):
+        """ Read a mesh stored by save
+
+        Keyword arguments:
+        :param path : path of the .npz file
+        :returns The TriangleMesh
+        """
+        with np.load(path) as data:
+            cell_start = data['cell_start'].tolist()
+            triangles = data['triangles'].tolist()
+            neighbors = data['neighbors'].tolist()
+            vertices = data['vertices'].tolist()
+        cells = list(zip(cell_start[:-1], cell_start[1:]))
+        return cls(vertices, [triangles[lo:hi] for lo, hi in cells], [neighbors[lo:hi] for lo, hi in cells])
+
+    def __len__(self):
+        return len(self.triangles)
+
+    def _count_holes(self):
+        """ Every hole closes one cycle of the dual graph, thus holes = E - T + C, where E is the number of diagonals,
+        T the number of triangles and C the number of connected components of the dual graph """
+        diagonals = sum(n != -1 for adj in self.neighbors for n in adj) // 2
+        components = 0
+        seen = set()
+        for t_root in range(len(self.triangles)):
+            if t_root in seen:
+                continue
+            components += 1
+            seen.add(t_root)
+            stack = [t_root]
+            while stack:
+                for n in self.neighbors[stack.pop()]:
+                    if n != -1 and n not in seen:
+                        seen.add(n)
+                        stack.append(n)
+        return diagonals - len(self.triangles) + components
+
+    def triangle_coordinates(self, t):
+        """ Returns the coordinates of the (ccw) vertices of triangle t """
+        return tuple(self.vertices[i] for i in self.triangles[t])
+
+    def padded_corners(self):
+        """ Vertex coordinates of all triangles as NumPy arrays, for vectorized edge side tests. Cells with fewer
+        vertices than the largest cell repeat their last vertex (a zero length edge never fails an edge side test).
+
+        :returns A list of K arrays of shape (T, 2), where K is the maximum number of vertices of a triangle (cell)
+        """
+        vertices = np.asarray(self.vertices, dtype=float).reshape(-1, 2)
+        size = max((len(tri) for tri in self.triangles), default=3)
+        cells = np.array([tri + (tri[-1],) * (size - len(tri)) for tri in self.triangles], dtype=np.int64)
+        cells = cells.reshape(-1, size)
+        return [vertices[cells[:, k]] for k in range(size)]
+
+    def locate_point(self, p):
+        """ Find the triangle that the point lies in
+
+        Keyword arguments:
+        :param p : the query point (tuple with x,y coordinates)
+        :returns The triangle ID, or None if the point lies outside the mesh
+        """
+        for t in range(len(self.triangles)):
+            if _contains(self.triangle_coordinates(t), p):
+                return t
+        return None
+
+    def locate_points(self, points, chunk_size=None):
+        """ Batch counterpart of locate_point. The barycentric (edge side) tests of a chunk of points against all
+        triangles are evaluated at once with NumPy.
+
+        Keyword arguments:
+        :param points : sequence (or array of shape (n, 2)) of point coordinates
+        :param chunk_size : number of points tested at once (None to keep each chunk around a million tests)
+        :returns NumPy int array with the triangle ID of every point (-1 for points outside the mesh)
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        result = np.full(len(points), -1, dtype=np.int64)
+        if not self.triangles or not len(points):
+            return result
+
+        corners = self.padded_corners()  # arrays of shape (T, 2), one per vertex of a triangle
+        if chunk_size is None:
+            chunk_size = max(1, 1_000_000 // len(self.triangles))
+
+        for lo in range(0, len(points), chunk_size):
+            px = points[lo:lo + chunk_size, 0][:, None]  # shape (chunk, 1), broadcast against (T,)
+            py = points[lo:lo + chunk_size, 1][:, None]
+            inside = np.ones((len(px), len(self.triangles)), dtype=bool)
+            for k in range(len(corners)):
+                a = corners[k]
+                b = corners[(k + 1) % len(corners)]
+                # Triangles are ccw, thus p lies inside (or on the boundary) when it is not to the right of any edge
+                inside &= ((b[:, 0] - a[:, 0]) * (py - a[:, 1]) - (b[:, 1] - a[:, 1]) * (px - a[:, 0])) >= 0
+            found = inside.any(axis=1)
+            result[lo:lo + chunk_size][found] = inside[found].argmax(axis=1)
+        return result
+
+    def find_sleeve(self, t_start, t_end, budget=None):
+        """ Find the 'sleeve', that is the path of adjacent triangles from t_start to t_end, by an A* search over the
+        centroids of the triangles. All the search state is local to the call.
+
+        Keyword arguments:
+        :param t_start : the ID of the first triangle
+        :param t_end : the ID of the last triangle
+        :param budget : maximum number of expanded triangles (None for no limit)
+        :returns A list of triangle IDs starting with t_start and ending with t_end (None if t_end is unreachable, or
+                 not reached within the budget)
+        """
+        goal = self.centroids[t_end]
+        parent = {t_start: None}  # Key: triangle ID, Value: the triangle ID it was reached from
+        cost = {t_start: 0.0}  # Key: triangle ID, Value: length of the best centroid path found so far
+        closed = set()
+        heap = [(dist(self.centroids[t_start], goal), t_start)]
+        while heap:
+            _, t = heappop(heap)
+            if t in closed:  # stale entry, t was pushed again with a lower cost
+                continue
+            if t == t_end:
+                return sleeve_from_tree(parent, t_end)
+            if budget is not None and len(closed) >= budget:
+                return None
+            closed.add(t)
+            for n in self.neighbors[t]:
+                if n == -1 or n in closed:
+                    continue
+                g_n = cost[t] + dist(self.centroids[t], self.centroids[n])
+                if n not in cost or g_n < cost[n]:
+                    cost[n] = g_n
+                    parent[n] = t
+                    # The straight line distance never overestimates, so t_end is popped with its best cost
+                    heappush(heap, (g_n + dist(self.centroids[n], goal), n))
+        return None
+
+    def sleeve_tree(self, t_start, targets=None, budget=None):
+        """ Shortest centroid path tree from t_start (Dijkstra), to share one search between the sleeves of several
+        queries with the same start triangle
+
+        Keyword arguments:
+        :param t_start : the ID of the root triangle
+        :param targets : IDs of the triangles of interest, the search stops once all of them are reached (None for the
+                         whole dual graph)
+        :param budget : maximum number of expanded triangles (None for no limit)
+        :returns The parent of every reached triangle (Key: triangle ID, Value: the triangle ID it was reached from,
+                 None for t_start), see sleeve_from_tree
+        """
+        remaining = None if targets is None else set(targets)
+        parent = {t_start: None}
+        cost = {t_start: 0.0}
+        settled = dict()  # the triangles popped from the heap, their parent is final
+        heap = [(0.0, t_start)]
+        while heap:
+            g, t = heappop(heap)
+            if t in settled:
+                continue
+            settled[t] = parent[t]
+            if remaining is not None:
+                remaining.discard(t)
+                if not remaining:
+                    break
+            if budget is not None and len(settled) > budget:
+                break
+            for n in self.neighbors[t]:
+                if n == -1 or n in settled:
+                    continue
+                g_n = g + dist(self.centroids[t], self.centroids[n])
+                if n not in cost or g_n < cost[n]:
+                    cost[n] = g_n
+                    parent[n] = t
+                    heappush(heap, (g_n, n))
+        return settled
+
+    def shared_edge(self, t1, t2):
+        """ Find the edge shared by two adjacent triangles. Follows the convention of find_portals in simple_funnel.py:
+        the edge is returned as the (origin, destination) of the half-edge that bounds t1.
+
+        Keyword arguments:
+        :param t1 : a triangle ID
+        :param t2 : the ID of a triangle adjacent to t1
+        :returns The coordinates (origin, destination) of the common edge
+        """
+        k = self.neighbors[t1].index(t2)
+        tri = self.triangles[t1]
+        return self.vertices[tri[k]], self.vertices[tri[(k + 1) % len(tri)]]
+
+    def portals(self, sleeve):
+        """ Returns the bot/top portals of a sleeve of triangle IDs (see funnel_shortest_path in simple_funnel.py
+        for the definition of bot and top portals) """
+        bot_portals = []
+        top_portals = []
+        for t1, t2 in zip(sleeve[:-1], sleeve[1:]):
+            bot, top = self.shared_edge(t1, t2)
+            bot_portals.append(bot)
+            top_portals.append(top)
+        return bot_portals, top_portals
+
+    def is_visible(self, p, q, t_p=None):
+        """ Walk the segment pq through adjacent triangles, starting from the triangle of p. q is visible from p if
+        the walk reaches the triangle of q without crossing the boundary of the polygon.
+
+        Keyword arguments:
+        :param p : coordinates (x,y) of the first point
+        :param q : coordinates (x,y) of the second point
+        :param t_p : ID of the triangle containing p (None to locate it)
+        :returns True if the segment pq lies inside the polygon, False otherwise (also when p lies outside)
+        """
+        t = self.locate_point(p) if t_p is None else t_p
+        if t is None:
+            return False
+        if _contains(self.triangle_coordinates(t), p, strictly=True):
+            return self.segment_walk(p, q, t) is not None
+
+        # p lies on an edge or a vertex of t. The walk must start from the triangle around p towards q, thus every
+        # triangle that contains p (reached through the edges that contain p) is tried
+        fan = [t]
+        seen = {t}
+        while fan:
+            t = fan.pop()
+            if self.segment_walk(p, q, t) is not None:
+                return True
+            tri = self.triangles[t]
+            for k, n in enumerate(self.neighbors[t]):
+                u, w = self.vertices[tri[k]], self.vertices[tri[(k + 1) % len(tri)]]
+                if n != -1 and n not in seen and _cross(u, w, p) == 0:
+                    seen.add(n)
+                    fan.append(n)
+        return False
+
+    def segment_walk(self, p, q, t):
+        """ Walk the segment pq through adjacent triangles, starting from triangle t
+
+        Keyword arguments:
+        :param p : coordinates (x,y) of the first point
+        :param q : coordinates (x,y) of the second point
+        :param t : ID of a triangle containing p
+        :returns The list of the triangle IDs crossed by pq, from t to the triangle of q (None if pq crosses the
+                 boundary of the polygon)
+        """
+        walk = [t]
+        prev = -1
+        for _ in range(len(self.triangles)):
+            corners = self.triangle_coordinates(t)
+            if _contains(corners, q):  # q lies in triangle t
+                return walk
+            # The exit edge (u, w) is ahead of q (q strictly to its right) and pq passes between u and w
+            exit_triangle = -1
+            for k, (u, w) in enumerate(zip(corners, corners[1:] + corners[:1])):
+                if _cross(u, w, q) < 0 and _cross(p, q, u) <= 0 <= _cross(p, q, w):
+                    # pq passes exactly through the vertex u or w (other than p). Then it does not necessarily enter
+                    # the triangle across the edge, but the one around that vertex which contains its direction
+                    for j, v in ((k, u), ((k + 1) % len(corners), w)):
+                        if v != p and _cross(p, q, v) == 0:
+                            exit_triangle = self._triangle_around_vertex(t, self.triangles[t][j], q)
+                            break
+                    else:
+                        n = self.neighbors[t][k]
+                        if n != -1 and n != prev:
+                            exit_triangle = n
+                    if exit_triangle != -1:
+                        break
+            if exit_triangle == -1:  # pq leaves the polygon
+                return None
+            prev, t = t, exit_triangle
+            walk.append(t)
+        return None
+
+    def _triangle_around_vertex(self, t, i, q):
+        """ Returns the triangle incident to vertex i (other than t) whose corner at vertex i contains the direction
+        from vertex i to q (-1 if there is none, i.e. that direction points outside the polygon). The triangles
+        around vertex i are reached from t through the edges incident to vertex i """
+        v = self.vertices[i]
+        seen = {t}
+        stack = [t]
+        while stack:
+            s = stack.pop()
+            tri = self.triangles[s]
+            j = tri.index(i)
+            a, b = self.vertices[tri[(j + 1) % len(tri)]], self.vertices[tri[j - 1]]
+            if s != t and _cross(v, a, q) >= 0 and _cross(v, b, q) <= 0:
+                return s
+            # the two edges of s incident to vertex i: (i, a) is edge j and (b, i) is edge j - 1
+            for n in (self.neighbors[s][j], self.neighbors[s][j - 1]):
+                if n != -1 and n not in seen:
+                    seen.add(n)
+                    stack.append(n)
+        return -1
+
+    def are_visible(self, pairs, t_starts=None):
+        """ Batch counterpart of is_visible. The first points of all pairs are located in one batch (locate_points)
+        and then the segment of every pair is walked.
+
+        Keyword arguments:
+        :param pairs : sequence of (p, q) coordinate pairs (or array of shape (n, 2, 2))
+        :param t_starts : triangle IDs of the first points (-1 if outside the mesh), if already known
+        :returns NumPy bool array, True where q is visible from p (False also when p lies outside the mesh)
+        """
+        pairs = np.asarray(pairs, dtype=float).reshape(-1, 2, 2)
+        if t_starts is None:
+            t_starts = self.locate_points(pairs[:, 0])
+        result = np.zeros(len(pairs), dtype=bool)
+        for k, ((p, q), t) in enumerate(zip(pairs.tolist(), np.asarray(t_starts).tolist())):
+            if t != -1:
+                result[k] = self.is_visible(tuple(p), tuple(q), t)
+        return result
+
+    def reflex_vertices(self):
+        """ Returns the indices of the reflex vertices, that is the polygon vertices with an interior angle greater
+        than 180 degrees. (The only vertices where a shortest path can bend) """
+        angle_sum = [0.0] * len(self.vertices)
+        for tri in self.triangles:
+            for k in range(len(tri)):
+                o, a, b = (self.vertices[tri[k]], self.vertices[tri[(k + 1) % len(tri)]],
+                           self.vertices[tri[k - 1]])
+                dot = (a[0] - o[0]) * (b[0] - o[0]) + (a[1] - o[1]) * (b[1] - o[1])
+                angle_sum[tri[k]] += atan2(abs(_cross(o, a, b)), dot)
+        return [i for i, angle in enumerate(angle_sum) if angle > pi + 1e-9]
+
+
+def sleeve_from_tree(parent, t_end):
+    """ The sleeve from the root of a search tree (see TriangleMesh.sleeve_tree) to t_end
+
+    Keyword arguments:
+    :param parent : Key: triangle ID, Value: the triangle ID it was reached from (None for the root)
+    :param t_end : the ID of the last triangle
+    :returns A list of triangle IDs from the root to t_end (None if t_end is not in the tree)
+    """
+    if t_end not in parent:
+        return None
+    sleeve = []
+    t = t_end
+    while t is not None:
+        sleeve.append(t)
+        t = parent[t]
+    sleeve.reverse()
+    return sleeve
+
+
+def _cross(o, a, b):
+    """ Cross product oa x ob (> 0 when o, a, b make a counter-clockwise turn) """
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def _contains(corners, p, strictly=False):
+    """ Whether the convex (ccw) polygon with the given corners contains p. Points on the boundary are contained
+    unless strictly is True """
+    for k in range(len(corners)):
+        side = _cross(corners[k - 1], corners[k], p)
+        if side < 0 or (strictly and side == 0):
+            return False
+    return True
+
+
+class TriangleGrid:
+    """ Uniform grid over the bounding box of a TriangleMesh for the location of large batches of points. Every cell
+    stores the triangles whose bounding box overlaps it, so a point is only tested against the few triangles of its
+    cell instead of all triangles (see TriangleMesh.locate_points).
+
+    Attributes:
+    :param mesh : the TriangleMesh
+    :param shape : (rows, columns) of the grid
+    :param cell_start : cell c holds the triangles cell_triangles[cell_start[c]:cell_start[c + 1]]
+    :param cell_triangles : triangle IDs sorted by cell (and by triangle ID inside a cell)
+    """
+
+    def __init__(self, mesh, cells=None):
+        self.mesh = mesh
+        vertices = np.asarray(mesh.vertices, dtype=float).reshape(-1, 2)
+        self._corners = mesh.padded_corners()  # arrays of shape (T, 2), one per vertex of a triangle
+
+        # About one triangle per cell (None), laid out with the aspect ratio of the bounding box
+        cells = max(1, len(mesh) if cells is None else cells)
+        self.min_xy = vertices.min(axis=0) if len(vertices) else np.zeros(2)
+        extent = np.maximum((vertices.max(axis=0) if len(vertices) else np.ones(2)) - self.min_xy, 1e-12)
+        columns = max(1, int(round(np.sqrt(cells * extent[0] / extent[1]))))
+        rows = max(1, int(round(cells / columns)))
+        self.shape = (rows, columns)
+        self.cell_size = extent / (columns, rows)
+
+        # Range of cells covered by the bounding box of every triangle
+        lo = self._cell_coordinates(np.minimum.reduce(self._corners))
+        hi = self._cell_coordinates(np.maximum.reduce(self._corners))
+        cell_ids = []
+        triangle_ids = []
+        for t in range(len(mesh)):
+            for row in range(lo[t, 1], hi[t, 1] + 1):
+                for column in range(lo[t, 0], hi[t, 0] + 1):
+                    cell_ids.append(row * columns + column)
+                    triangle_ids.append(t)
+        cell_ids = np.asarray(cell_ids, dtype=np.int64)
+        order = np.lexsort((np.asarray(triangle_ids, dtype=np.int64), cell_ids))
+        self.cell_triangles = np.asarray(triangle_ids, dtype=np.int64)[order]
+        self.cell_start = np.searchsorted(cell_ids[order], np.arange(rows * columns + 1))
+
+    def _cell_coordinates(self, points):
+        """ (column, row) of the cell of every point, clipped to the grid """
+        cell = np.floor((points - self.min_xy) / self.cell_size).astype(np.int64)
+        return np.clip(cell, 0, (self.shape[1] - 1, self.shape[0] - 1))
+
+    def locate_points(self, points):
+        """ Same as TriangleMesh.locate_points (the same triangle ID is returned when a point lies on a shared edge)
+
+        Keyword arguments:
+        :param points : sequence (or array of shape (n, 2)) of point coordinates
+        :returns NumPy int array with the triangle ID of every point (-1 for points outside the mesh)
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        result = np.full(len(points), -1, dtype=np.int64)
+        if not len(points) or not len(self.cell_triangles):
+            return result
+
+        cell = self._cell_coordinates(points)
+        cell = cell[:, 1] * self.shape[1] + cell[:, 0]
+        # Points outside the bounding box would be clipped to a border cell, they can be skipped right away
+        inside_box = np.all((points >= self.min_xy) & (points <= self.min_xy + self.cell_size * self.shape[::-1]),
+                            axis=1)
+        order = np.argsort(cell, kind='stable')
+        order = order[inside_box[order]]
+        boundaries = np.flatnonzero(np.diff(cell[order])) + 1
+
+        # Test the points of every non-empty cell against the triangles of that cell at once
+        for group in np.split(order, boundaries):
+            if not len(group):
+                continue
+            c = cell[group[0]]
+            candidates = self.cell_triangles[self.cell_start[c]:self.cell_start[c + 1]]
+            if not len(candidates):
+                continue
+            px = points[group, 0][:, None]  # shape (n, 1), broadcast against (k,)
+            py = points[group, 1][:, None]
+            inside = np.ones((len(group), len(candidates)), dtype=bool)
+            for k in range(len(self._corners)):
+                a = self._corners[k][candidates]
+                b = self._corners[(k + 1) % len(self._corners)][candidates]
+                inside &= ((b[:, 0] - a[:, 0]) * (py - a[:, 1]) - (b[:, 1] - a[:, 1]) * (px - a[:, 0])) >= 0
+            found = inside.any(axis=1)
+            result[group[found]] = candidates[inside[found].argmax(axis=1)]
+        return result
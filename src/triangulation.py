@@ -23,8 +23,13 @@ def make_monotone(poly):
     """ Returns A partitioning of a polygon into monotone sub-polygons, stored in a DCEL.
     (Page 53, Computational Geometry, Mark de Berg)
 
+    The algorithm also works for polygons with holes. The topmost vertex of every hole is a split vertex, thus the
+    diagonal inserted there joins the hole to the boundary of the face it lies in, before any other vertex of the
+    hole is met by the sweep line. Until then the hole is kept out of the DCEL faces (otherwise every face split
+    would have to find out on which side each hole lies).
+
     Keyword arguments:
-    :param poly: A shapely simple Polygon
+    :param poly: A shapely Polygon (possibly with holes)
     """
     # We need to find the edge to the left of each vertex, therefore we store the ccw half-edges of the Polygon
     # intersecting the sweep line in a BST. The inorder traversal of the BST corresponds to a left to right
@@ -48,6 +53,11 @@ def make_monotone(poly):
     # assign the type attribute to all dcel vertices (in vertex_type dict)
     assign_type_to_vertices(polygon_dcel, vertex_type)
 
+    # Detach the holes from the polygon face. Key: topmost Vertex of a hole, Value: a half-edge of the hole
+    polygon_face = polygon_dcel.hedges[0].incident_face
+    holes = {top_vertex(hedge): hedge for hedge in polygon_face.inner_components}
+    polygon_face.inner_components = []
+
     # Sort the vertices on y-coordinate before the sweep. If two vertices have the same y-coordinate then
     # the leftmost one has higher priority. Thus, we first sort on ascending order for x-coordinate (secondary key),
     # and then sort on descending order for y-coordinate (primary key)
@@ -63,7 +73,7 @@ def make_monotone(poly):
             case "start vertex":
                 root = handle_start_vertex(root, helper, v_i)
             case "split vertex":
-                root = handle_split_vertex(polygon_dcel, root, helper, v_i)
+                root = handle_split_vertex(polygon_dcel, root, helper, v_i, holes)
             case "end vertex":
                 root = handle_end_vertex(polygon_dcel, root, helper, vertex_type, v_i)
             case "merge vertex":
@@ -108,7 +118,7 @@ def handle_end_vertex(d, root, helper, vertex_type, v_i):
     return root
 
 
-def handle_split_vertex(d, root, helper, v_i):
+def handle_split_vertex(d, root, helper, v_i, holes=None):
     """ (Page 54, Computational Geometry, third edition, Mark de Berg)
 
     Keyword arguments:
@@ -116,12 +126,17 @@ def handle_split_vertex(d, root, helper, v_i):
     :param root : root of BST
     :param helper: Dictionary storing for each half-edge the helper Vertex. Key: Hedge , Value: Vertex
     :param v_i : Vertex that the sweep line intersects at the moment
+    :param holes : Dictionary of the holes not yet met by the sweep line. Key: topmost Vertex, Value: Hedge of the hole
     """
     e_i = v_i.incident_edge
 
     # Search BST to find the edge e_j directly left of v_i
     e_j = find_hedge_directly_to_the_left(root, v_i)
 
+    # v_i is the topmost vertex of a hole. The hole lies in the face of e_j and the diagonal below joins the two
+    if holes and v_i in holes:
+        d.add_hole(e_j.incident_face, holes.pop(v_i))
+
     # Insert diagonal connecting v_i to helper(e_j) in DCEL (which splits e_j.incident_face)
     d.insert_diagonal(v_i, helper[e_j], e_j.incident_face)
 
@@ -208,13 +223,26 @@ def assign_type_to_vertices(d, vertex_type):
     """
     start_inner_hedge = d.hedges[0]  # we know for a fact hedges[0] is a half-edge bounding the interior face
 
-    tmp_hedge = start_inner_hedge
-    while True:
-        # we are always assigning the type of v_b (the middle vertex)
-        assign_type_to_vertex(vertex_type, tmp_hedge.prev.origin, tmp_hedge.origin, tmp_hedge.next.origin)
+    # The outer boundary and every hole. (On every one of them the interior of the polygon lies to the left)
+    for start_hedge in [start_inner_hedge] + start_inner_hedge.incident_face.inner_components:
+        tmp_hedge = start_hedge
+        while True:
+            # we are always assigning the type of v_b (the middle vertex)
+            assign_type_to_vertex(vertex_type, tmp_hedge.prev.origin, tmp_hedge.origin, tmp_hedge.next.origin)
+            tmp_hedge = tmp_hedge.next
+            if tmp_hedge is start_hedge:
+                break
+
+
+def top_vertex(hedge):
+    """ Returns the topmost vertex (see Vertex.is_above) of the boundary component of a half-edge """
+    top = hedge.origin
+    tmp_hedge = hedge.next
+    while tmp_hedge is not hedge:
+        if tmp_hedge.origin.is_above(top):
+            top = tmp_hedge.origin
         tmp_hedge = tmp_hedge.next
-        if tmp_hedge is start_inner_hedge:
-            break
+    return top
 
 
 def assign_type_to_vertex(vertex_type, v_a, v_b, v_c):
@@ -340,8 +368,9 @@ def triangulate_monotone_polygon(d, f):
             # connecting u (the vertex that was popped from the top of stack) to v_j
             next_face_to_be_split = d.find_hedge_connecting_origin_dest(u, v_j).incident_face
 
-            # while stack not empty and a diagonal from v_j to top of stack is inside the polygon
-            while stack and not ccw(v_j.coordinates, u.coordinates, stack[-1].coordinates):
+            # while stack not empty and a diagonal from v_j to top of stack is inside the polygon. (v_j, u, stack[-1]
+            # must turn clockwise strictly, otherwise the diagonal passes through u and the triangle has no area)
+            while stack and ccw(v_j.coordinates, stack[-1].coordinates, u.coordinates):
                 u = stack.pop(-1)
 
                 # Insert diagonal connecting v_j to u. The diagonal splits the face next_face_to_be_split.
@@ -366,10 +395,10 @@ def triangulate_monotone_polygon(d, f):
 
 
 def triangulate_polygon(poly):
-    """ Triangulates a simple polygon
+    """ Triangulates a polygon (possibly with holes)
 
     Keyword arguments:
-    :param poly: A simple polygon to be triangulated
+    :param poly: A polygon to be triangulated
     :return: the DCEL storing the triangulated polygon
     """
     dcel_triangulated = make_monotone(poly)
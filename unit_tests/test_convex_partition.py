@@ -0,0 +1,103 @@
+import unittest
+from src.triangulation import triangulate_polygon
+from src.convex_partition import convex_partition, convex_partition_polygon, is_diagonal, is_inessential
+from src.triangle_mesh import TriangleMesh, TriangleGrid
+from src.shortest_path_map import ShortestPathMap
+from src.router import Router
+from src.routing import path_length
+from shapely.geometry import Polygon, Point, LineString
+from random import uniform, seed
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.poly = Polygon([
+            (10, 21), (11.82, 22.31), (13.48, 21.35), (14.68, 21.97),
+            (14.86, 18.85), (17.2, 19.51), (16.16, 15.91), (13.88, 16.55),
+            (15.58, 12.45), (10.76, 15.11), (9.58, 14.31), (8.54, 15.91),
+            (9, 19), (10.38, 17.95), (10.94, 19.59)
+        ])
+        self.partition = convex_partition_polygon(self.poly)
+        self.mesh = TriangleMesh.from_dcel(self.partition)
+        self.triangle_mesh = TriangleMesh.from_dcel(triangulate_polygon(self.poly))
+
+        seed(2)
+        self.points = []
+        while len(self.points) < 40:
+            p = (uniform(8.5, 17.2), uniform(12.5, 22.3))
+            if self.poly.contains(Point(p)):
+                self.points.append(p)
+
+    def test_convex_cells(self):
+        """ Test that every cell is convex, that the cells cover the polygon and that all remaining diagonals are
+        essential """
+        self.assertLess(len(self.mesh), len(self.triangle_mesh))
+        area = 0
+        for t in range(len(self.mesh)):
+            corners = self.mesh.triangle_coordinates(t)
+            for k in range(len(corners)):
+                a, b, c = corners[k - 2], corners[k - 1], corners[k]
+                self.assertGreater((b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]), 0)
+            area += Polygon(corners).area
+        self.assertAlmostEqual(area, self.poly.area)
+        for hedge in self.partition.hedges:
+            if is_diagonal(hedge):
+                self.assertFalse(is_inessential(hedge))
+
+    def test_collinear_vertices(self):
+        """ Test that straight corners count as convex: a convex polygon with collinear vertices is a single cell """
+        poly = Polygon([(0, 0), (5, 0), (10, 0), (10, 5), (10, 10), (5, 10), (0, 10), (0, 5)])
+        mesh = TriangleMesh.from_dcel(convex_partition_polygon(poly))
+        self.assertEqual(len(mesh), 1)
+        self.assertEqual(len(mesh.triangles[0]), 8)
+        self.assertTrue(mesh.is_visible((1, 1), (9, 9)))
+        poly = Polygon([(0, 0), (5, 0), (10, 0), (10, 10), (5, 10), (5, 5), (0, 5)])
+        self.assertEqual(len(TriangleMesh.from_dcel(convex_partition_polygon(poly))), 2)
+
+    def test_partition_in_place(self):
+        """ Test that convex_partition returns the same DCEL and drops the removed diagonals from its half-edges """
+        triangulated_dcel = triangulate_polygon(self.poly)
+        self.assertIs(convex_partition(triangulated_dcel), triangulated_dcel)
+        self.assertEqual(len(triangulated_dcel.hedges), len(self.partition.hedges))
+        for hedge in triangulated_dcel.hedges:
+            self.assertIn(hedge.twin, triangulated_dcel.hedges)
+            self.assertIn(hedge.incident_face, triangulated_dcel.faces)
+
+    def test_point_location_and_visibility(self):
+        """ Test point location (single, batch and grid) and visibility on the convex cells """
+        points = self.points + [(0, 0), (12, 13.2)] + list(self.mesh.vertices)
+        located = self.mesh.locate_points(points).tolist()
+        self.assertListEqual(TriangleGrid(self.mesh).locate_points(points).tolist(), located)
+        for p, t in zip(points, located):
+            expected = self.mesh.locate_point(p)
+            self.assertEqual(t, -1 if expected is None else expected)
+            if t != -1:
+                self.assertTrue(Polygon(self.mesh.triangle_coordinates(t)).intersects(Point(p)))
+        for p in self.points:
+            for q in self.points + list(self.mesh.vertices):
+                self.assertEqual(self.mesh.is_visible(p, q), self.poly.covers(LineString([p, q])))
+
+    def test_shortest_paths(self):
+        """ Test that sleeves are shorter and that paths over the convex cells are as short as over the triangles """
+        router = Router(self.mesh)
+        triangle_router = Router(self.triangle_mesh)
+        for p in self.points:
+            for q in self.points:
+                if p == q:
+                    continue
+                sleeve = router.sleeve(p, q)
+                self.assertLessEqual(len(sleeve), len(triangle_router.sleeve(p, q)))
+                path = router.shortest_path(p, q)
+                self.assertTrue(self.poly.covers(LineString(path)))
+                self.assertAlmostEqual(path_length(path), path_length(triangle_router.shortest_path(p, q)))
+
+    def test_shortest_path_map(self):
+        """ Test the shortest path map over the convex cells """
+        spm = ShortestPathMap(self.mesh, self.points[0])
+        triangle_spm = ShortestPathMap(self.triangle_mesh, self.points[0])
+        for q in self.points + list(self.mesh.vertices):
+            self.assertAlmostEqual(spm.distance(q), triangle_spm.distance(q))
+
+
+if __name__ == '__main__':
+    unittest.main()
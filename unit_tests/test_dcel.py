@@ -1,6 +1,6 @@
 import unittest
 from src.dcel import Dcel, Vertex
-from shapely.geometry import Polygon
+from shapely.geometry import Polygon, Point
 import matplotlib.pyplot as plt
 
 
@@ -179,6 +179,141 @@ class MyTestCase(unittest.TestCase):
         self.test_faces_unbounded_and_bounded()
         self.test_faces_and_hedge_incident_face_link()
 
+    def test_remove_diagonal(self):
+        """ Test remove_diagonal by inserting diagonals and removing them again (in a different order). The dcel must
+        be back to the original polygon and all the above tests must still pass in between.
+        """
+        vertices = self.polygon_dcel.vertices
+        number_of_hedges = len(self.polygon_dcel.hedges)
+        diagonals = []
+        for i in (8, 9, 4, 6, 7):
+            diagonals.append(self.polygon_dcel.insert_diagonal(
+                vertices[15], vertices[i], self.polygon_dcel.find_common_face_for_diagonal(vertices[15], vertices[i])
+            ))
+
+        for k, diagonal in enumerate([diagonals[2], diagonals[0], diagonals[4], diagonals[1], diagonals[3]]):
+            merged = self.polygon_dcel.remove_diagonal(diagonal if k % 2 else diagonal.twin)
+            self.assertIn(merged, self.polygon_dcel.faces)
+            self.assertNotIn(diagonal, self.polygon_dcel.hedges)
+            self.assertNotIn(diagonal.twin, self.polygon_dcel.hedges)
+            self.assertEqual(len(self.polygon_dcel.faces), 6 - k)
+            self.test_hedges_no_none_attribute()
+            self.test_hedges_next_prev_with_diagonals()
+            self.test_faces_unbounded_and_bounded()
+            self.test_faces_and_hedge_incident_face_link()
+
+        self.assertEqual(len(self.polygon_dcel.hedges), number_of_hedges)
+        self.test_hedges_next_prev_of_polygon()
+        bounded_face = next(f for f in self.polygon_dcel.faces if f.outer_component is not None)
+        boundary = self.polygon_dcel.find_all_vertices_bounding_face(bounded_face)
+        start = boundary.index(vertices[0])
+        self.assertListEqual(boundary[start:] + boundary[:start], vertices)
+
+    def test_flip_diagonal(self):
+        """ Test flip_diagonal on the quadrilateral 15, 7, 8, 9 (diagonals 15-8 and 7-9). Flipping twice must give back
+        the original diagonal. All the above tests must still pass after the flips.
+        """
+        vertices = self.polygon_dcel.vertices
+        for i in (8, 9, 7):
+            self.polygon_dcel.insert_diagonal(
+                vertices[15], vertices[i], self.polygon_dcel.find_common_face_for_diagonal(vertices[15], vertices[i])
+            )
+        diagonal = self.polygon_dcel.find_hedge_connecting_origin_dest(vertices[15], vertices[8])
+        number_of_faces = len(self.polygon_dcel.faces)
+
+        flipped = self.polygon_dcel.flip_diagonal(diagonal)
+        self.assertIs(flipped, diagonal)
+        self.assertSetEqual({flipped.origin, flipped.twin.origin}, {vertices[7], vertices[9]})
+        for hedge in (flipped, flipped.twin):
+            triangle = self.polygon_dcel.find_all_vertices_bounding_face(hedge.incident_face)
+            self.assertEqual(len(triangle), 3)
+            a, b, c = (v.coordinates for v in triangle)
+            self.assertGreater((b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]), 0)  # ccw
+        self.assertEqual(len(self.polygon_dcel.faces), number_of_faces)
+        self.test_hedges_origin()
+        self.test_hedges_no_none_attribute()
+        self.test_hedges_twin()
+        self.test_hedges_next_prev_with_diagonals()
+        self.test_faces_unbounded_and_bounded()
+        self.test_faces_and_hedge_incident_face_link()
+
+        self.polygon_dcel.flip_diagonal(flipped)
+        self.assertSetEqual({flipped.origin, flipped.twin.origin}, {vertices[15], vertices[8]})
+        self.test_faces_and_hedge_incident_face_link()
+
+    def test_build_from_polygon_with_holes(self):
+        """ Test that the holes of a polygon become inner components of the bounded face, traversed clockwise """
+        d = Dcel()
+        d.build_from_polygon(Polygon([(0, 0), (10, 0), (10, 10), (0, 10)], [[(2, 2), (2, 4), (4, 4), (4, 2)],
+                                                                          [(6, 6), (8, 6), (8, 8), (6, 8)]]))
+        self.assertEqual(len(d.vertices), 12)
+        self.assertEqual(len(d.hedges), 24)
+        self.assertEqual(len(d.faces), 2)
+        bounded_face = d.hedges[0].incident_face
+        unbounded_face = next(f for f in d.faces if f is not bounded_face)
+        self.assertIsNone(unbounded_face.outer_component)
+        self.assertEqual(len(unbounded_face.inner_components), 3)
+        self.assertEqual(len(bounded_face.inner_components), 2)
+        for hole in bounded_face.inner_components:
+            coordinates = []
+            tmp_hedge = hole
+            while True:
+                self.assertIs(tmp_hedge.incident_face, bounded_face)
+                self.assertIs(tmp_hedge.twin.incident_face, unbounded_face)
+                self.assertIs(tmp_hedge.origin.incident_edge, tmp_hedge)
+                coordinates.append(tmp_hedge.origin.coordinates)
+                tmp_hedge = tmp_hedge.next
+                if tmp_hedge is hole:
+                    break
+            self.assertEqual(len(coordinates), 4)
+            self.assertFalse(Polygon(coordinates).exterior.is_ccw)  # clockwise, the interior lies to the left
+
+    def test_insert_diagonal_with_holes(self):
+        """ Test that a diagonal between the outer boundary and a hole joins the two without splitting the face, and
+        that a face split moves every hole to the face it lies in """
+        d = Dcel()
+        d.build_from_polygon(Polygon([(0, 0), (10, 0), (10, 10), (0, 10)], [[(2, 2), (2, 3), (3, 3), (3, 2)],
+                                                                          [(7, 7), (8, 7), (8, 8), (7, 8)]]))
+        vertex = {v.coordinates: v for v in d.vertices}
+        bounded_face = d.hedges[0].incident_face
+
+        # The diagonal (0, 10) - (10, 0) splits the face in two, with one hole each
+        d.insert_diagonal(vertex[(0.0, 10.0)], vertex[(10.0, 0.0)], bounded_face)
+        self.assertEqual(len(d.faces), 3)
+        for f in d.faces:
+            if f.outer_component is None:
+                continue
+            self.assertEqual(len(f.inner_components), 1)
+            boundary = Polygon([v.coordinates for v in d.find_all_vertices_bounding_face(f)])
+            tmp_hedge = f.inner_components[0]
+            while True:
+                self.assertIs(tmp_hedge.incident_face, f)
+                self.assertTrue(boundary.contains(Point(tmp_hedge.origin.coordinates)))
+                tmp_hedge = tmp_hedge.next
+                if tmp_hedge is f.inner_components[0]:
+                    break
+
+        # The diagonal (0, 0) - (2, 2) joins the first hole to the outer boundary of its face
+        f = vertex[(0.0, 0.0)].incident_edge.incident_face
+        d.insert_diagonal(vertex[(0.0, 0.0)], vertex[(2.0, 2.0)], f)
+        self.assertEqual(len(d.faces), 3)
+        self.assertIn(f, d.faces)
+        self.assertListEqual(f.inner_components, [])
+        self.assertEqual(len(d.find_all_vertices_bounding_face(f)), 3 + 2 + 4)
+        self.test_hedges_no_none_attribute()
+        for hedge in d.hedges:
+            self.assertIs(hedge.next.prev, hedge)
+            self.assertIs(hedge.next.incident_face, hedge.incident_face)
+
+        # A second diagonal between the hole and the outer boundary now splits the face. (The area of the faces is
+        # the area of the polygon plus the area of the second hole, which is still an inner component)
+        d.insert_diagonal(vertex[(3.0, 3.0)], vertex[(10.0, 0.0)], f)
+        self.assertEqual(len(d.faces), 4)
+        bounded_faces = [f for f in d.faces if f.outer_component is not None]
+        self.assertEqual(sum(len(f.inner_components) for f in bounded_faces), 1)
+        self.assertAlmostEqual(sum(Polygon([v.coordinates for v in d.find_all_vertices_bounding_face(f)]).area
+                                   for f in bounded_faces), 100 - 1)
+
 
 if __name__ == '__main__':
     unittest.main()
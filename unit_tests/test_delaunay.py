@@ -0,0 +1,69 @@
+import unittest
+from src.triangulation import triangulate_polygon
+from src.delaunay import delaunay_flip, delaunay_triangulate_polygon, is_illegal
+from src.triangle_mesh import TriangleMesh
+from src.router import Router
+from src.routing import path_length
+from unit_tests.test_shortest_path_map import visibility_graph_distance
+from shapely.geometry import Polygon, Point
+from math import atan2, degrees
+from random import uniform, seed
+
+
+def min_angle(corners):
+    """ Smallest angle (in degrees) of a triangle """
+    angles = []
+    for k in range(3):
+        o, a, b = corners[k], corners[(k + 1) % 3], corners[k - 1]
+        cross = (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+        dot = (a[0] - o[0]) * (b[0] - o[0]) + (a[1] - o[1]) * (b[1] - o[1])
+        angles.append(degrees(atan2(abs(cross), dot)))
+    return min(angles)
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.poly = Polygon([
+            (10, 21), (11.82, 22.31), (13.48, 21.35), (14.68, 21.97),
+            (14.86, 18.85), (17.2, 19.51), (16.16, 15.91), (13.88, 16.55),
+            (15.58, 12.45), (10.76, 15.11), (9.58, 14.31), (8.54, 15.91),
+            (9, 19), (10.38, 17.95), (10.94, 19.59)
+        ])
+        self.triangulated_dcel = delaunay_triangulate_polygon(self.poly)
+        self.mesh = TriangleMesh.from_dcel(self.triangulated_dcel)
+        self.monotone_mesh = TriangleMesh.from_dcel(triangulate_polygon(self.poly))
+
+    def test_delaunay(self):
+        """ Test that the result is a triangulation of the polygon without illegal diagonals and with a smallest angle
+        at least as large as the one of the monotone triangulation """
+        self.assertEqual(len(self.mesh), len(self.monotone_mesh))
+        self.assertEqual(len(self.triangulated_dcel.hedges), 2 * (2 * len(self.mesh.vertices) - 3))
+        area = 0
+        for t in range(len(self.mesh)):
+            a, b, c = self.mesh.triangle_coordinates(t)
+            self.assertGreater((b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]), 0)
+            area += Polygon((a, b, c)).area
+        self.assertAlmostEqual(area, self.poly.area)
+        for hedge in self.triangulated_dcel.hedges:
+            self.assertFalse(is_illegal(hedge))
+        self.assertGreaterEqual(min(min_angle(self.mesh.triangle_coordinates(t)) for t in range(len(self.mesh))),
+                                min(min_angle(self.monotone_mesh.triangle_coordinates(t))
+                                    for t in range(len(self.monotone_mesh))))
+        # A Delaunay triangulation is already legal, nothing to flip
+        self.assertEqual(delaunay_flip(self.triangulated_dcel), 0)
+
+    def test_shortest_paths(self):
+        """ Test that shortest paths over the Delaunay triangulation are exact """
+        seed(3)
+        router = Router(self.mesh)
+        points = []
+        while len(points) < 20:
+            p = (uniform(8.5, 17.2), uniform(12.5, 22.3))
+            if self.poly.contains(Point(p)):
+                points.append(p)
+        for p, q in zip(points[:-1], points[1:]):
+            self.assertAlmostEqual(path_length(router.shortest_path(p, q)), visibility_graph_distance(self.poly, p, q))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from math import dist, isnan
+from src.triangulation import triangulate_polygon
+from src.triangle_mesh import TriangleMesh
+from src.shortest_path_map import ShortestPathMap
+from src.distance_matrix import distance_matrix
+from shapely.geometry import Polygon, Point
+from random import uniform, seed
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.poly = Polygon([
+            (10, 21), (11.82, 22.31), (13.48, 21.35), (14.68, 21.97),
+            (14.86, 18.85), (17.2, 19.51), (16.16, 15.91), (13.88, 16.55),
+            (15.58, 12.45), (10.76, 15.11), (9.58, 14.31), (8.54, 15.91),
+            (9, 19), (10.38, 17.95), (10.94, 19.59)
+        ])
+        self.mesh = TriangleMesh.from_dcel(triangulate_polygon(self.poly))
+
+        seed(2)
+        points = []
+        while len(points) < 20:
+            p = (uniform(8.5, 17.2), uniform(12.5, 22.3))
+            if self.poly.contains(Point(p)):
+                points.append(p)
+        self.sources = points[:8] + [(0, 0)]  # last source lies outside the polygon
+        self.targets = points[8:] + [(30, 30)]  # last target lies outside the polygon
+
+    def test_distance_matrix(self):
+        """ Test the matrix against one ShortestPathMap per source """
+        matrix = distance_matrix(self.mesh, self.sources, self.targets, processes=1)
+        self.assertEqual(matrix.shape, (len(self.sources), len(self.targets)))
+        for i, source in enumerate(self.sources[:-1]):
+            spm = ShortestPathMap(self.mesh, source)
+            for j, target in enumerate(self.targets[:-1]):
+                self.assertAlmostEqual(matrix[i, j], spm.distance(target))
+            self.assertTrue(isnan(matrix[i, -1]))
+        self.assertTrue(all(isnan(d) for d in matrix[-1]))
+
+    def test_distance_matrix_processes(self):
+        """ Test that the process pool gives exactly the matrix (and paths) computed in this process """
+        matrix, paths = distance_matrix(self.mesh, self.sources, self.targets, return_paths=True, processes=1)
+        matrix2, paths2 = distance_matrix(self.mesh, self.sources, self.targets, return_paths=True, processes=2)
+        self.assertTrue(((matrix == matrix2) | (matrix != matrix)).all())  # equal, or both nan
+        self.assertEqual(paths, paths2)
+
+    def test_paths(self):
+        """ Test that every path connects its source and target and that its length is the matrix entry """
+        matrix, paths = distance_matrix(self.mesh, self.sources, self.targets, return_paths=True, processes=1)
+        for i, source in enumerate(self.sources[:-1]):
+            for j, target in enumerate(self.targets[:-1]):
+                path = paths[i][j]
+                self.assertEqual(path[0], source)
+                self.assertEqual(path[-1], target)
+                self.assertAlmostEqual(sum(dist(a, b) for a, b in zip(path[:-1], path[1:])), matrix[i, j])
+            self.assertIsNone(paths[i][-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from src.triangulation import triangulate_polygon
+from src.triangle_mesh import TriangleMesh
+from src.shortest_path_map import ShortestPathMap
+from src.distance_oracle import DistanceOracle
+from shapely.geometry import Polygon, Point
+from shapely.geometry.polygon import orient
+from random import uniform, seed
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.poly = Polygon([
+            (10, 21), (11.82, 22.31), (13.48, 21.35), (14.68, 21.97),
+            (14.86, 18.85), (17.2, 19.51), (16.16, 15.91), (13.88, 16.55),
+            (15.58, 12.45), (10.76, 15.11), (9.58, 14.31), (8.54, 15.91),
+            (9, 19), (10.38, 17.95), (10.94, 19.59)
+        ])
+        self.mesh = TriangleMesh.from_dcel(triangulate_polygon(self.poly))
+        self.oracle = DistanceOracle(self.mesh)
+
+        seed(4)
+        self.points = []
+        while len(self.points) < 40:
+            p = (uniform(8.5, 17.2), uniform(12.5, 22.3))
+            if self.poly.contains(Point(p)):
+                self.points.append(p)
+
+    def test_hubs(self):
+        """ The hubs are exactly the reflex vertices of the polygon (right turns of the ccw boundary) """
+        ring = list(orient(self.poly).exterior.coords)[:-1]
+        reflex = set()
+        for a, b, c in zip([ring[-1]] + ring[:-1], ring, ring[1:] + [ring[0]]):
+            if (b[0] - a[0]) * (c[1] - b[1]) - (b[1] - a[1]) * (c[0] - b[0]) < 0:
+                reflex.add(b)
+        self.assertEqual(len(reflex), 6)
+        self.assertSetEqual({self.mesh.vertices[h] for h in self.oracle.hubs}, reflex)
+
+    def test_distance(self):
+        """ Compare the oracle with the shortest path map of every source """
+        for p in self.points[:10]:
+            spm = ShortestPathMap(self.mesh, p)
+            for q in self.points:
+                self.assertAlmostEqual(self.oracle.distance(p, q), spm.distance(q))
+
+    def test_max_rows(self):
+        """ An oracle that keeps only 2 rows of the hub distance matrix (and no labels) gives the same distances """
+        oracle = DistanceOracle(self.mesh, max_rows=2)
+        self.assertIsNone(oracle.labels)
+        self.assertEqual(len(oracle._rows), 0)  # nothing is preprocessed
+        for p in self.points[:10]:
+            for q in self.points[10:20]:
+                self.assertAlmostEqual(oracle.distance(p, q), self.oracle.distance(p, q))
+        pairs = [(p, q) for p in self.points[:10] for q in self.points[10:20]]
+        for (p, q), d in zip(pairs, oracle.distances(pairs)):
+            self.assertAlmostEqual(d, self.oracle.distance(p, q))
+        self.assertLessEqual(len(oracle._rows), 2)
+
+    def test_distances_outside(self):
+        """ Batch distances give nan for points outside the polygon """
+        d = self.oracle.distances([(self.points[0], (0, 0)), (self.points[0], self.points[1])])
+        self.assertNotEqual(d[0], d[0])
+        self.assertAlmostEqual(d[1], self.oracle.distance(self.points[0], self.points[1]))
+        self.assertIsNone(self.oracle.distance((0, 0), self.points[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
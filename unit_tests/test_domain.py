@@ -0,0 +1,92 @@
+import unittest
+from src.domain import land_minus_lakes, sea, sea_mesh
+from src.triangulation import triangulate_polygon
+from src.triangle_mesh import TriangleMesh
+from src.router import Router
+from src.routing import BatchRouter
+from shapely.geometry import Polygon, LineString, box
+import geopandas as gpd
+import tempfile
+import os
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        # Land 1 with two lakes, land 2 with a lake that touches its coastline, land 3 cut at the antimeridian
+        # (3-E, 3-W) with one lake in each half and land 4 without lakes
+        self.land = gpd.GeoDataFrame({
+            'id': ['1', '2', '3-E', '3-W', '4'],
+            'geometry': [box(0, 0, 10, 10), box(20, 0, 30, 10), box(40, 0, 50, 10), box(50, 0, 60, 10),
+                         box(70, 0, 80, 10)]
+        })
+        self.lakes = gpd.GeoDataFrame({
+            'parent_id': [1, 1, 2, 3, 3],
+            'geometry': [box(2, 2, 4, 4), Polygon([(6, 6), (8, 6), (7, 8)]), Polygon([(20, 2), (24, 5), (20, 8)]),
+                         box(42, 2, 44, 4), box(52, 2, 54, 4)]
+        })
+        self.domain = land_minus_lakes(self.land, self.lakes)
+
+    def test_land_minus_lakes(self):
+        """ Test that every land polygon loses exactly the area of its lakes """
+        self.assertEqual(len(self.domain), 5)
+        expected_holes = [2, 0, 1, 1, 0]
+        expected_area = [100 - 4 - 2, 100 - 12, 100 - 4, 100 - 4, 100]
+        for poly, holes, area in zip(self.domain, expected_holes, expected_area):
+            self.assertTrue(poly.is_valid)
+            self.assertEqual(len(poly.interiors), holes)
+            self.assertAlmostEqual(poly.area, area)
+
+    def test_triangulate_domain(self):
+        """ Test that every polygon of the domain is triangulated in one pass, with its holes """
+        for poly in self.domain:
+            mesh = TriangleMesh.from_dcel(triangulate_polygon(poly))
+            self.assertEqual(mesh.holes, len(poly.interiors))
+            self.assertAlmostEqual(sum(Polygon(mesh.triangle_coordinates(t)).area for t in range(len(mesh))),
+                                   poly.area)
+
+    def test_assign_polygons(self):
+        """ Test that a point inside a lake lies in no polygon of the domain """
+        router = BatchRouter(self.domain)
+        located = router.assign_polygons([(1, 1), (3, 3), (7, 6.5), (21, 5), (25, 5), (43, 3), (45, 5), (53, 3),
+                                          (75, 5)])
+        self.assertListEqual(located.tolist(), [0, -1, -1, -1, 1, -1, 2, -1, 4])
+
+    def test_sea(self):
+        """ Test the sea of a box: islands inside the box are holes, land across the side of the box cuts the
+        exterior and an island with a vertex on the side of the box does not touch the exterior """
+        land = gpd.GeoDataFrame({'id': ['1', '2', '3', '4'], 'geometry': [
+            box(10, 5, 20, 15), Polygon([(30, -5), (40, -5), (35, 8)]), Polygon([(50, 20), (55, 10), (60, 15)]),
+            box(200, 0, 210, 10)]})
+        polygons = sea(land, (0, 0, 100, 20))
+        self.assertEqual(len(polygons), 1)
+        poly = polygons[0]
+        self.assertTrue(poly.is_valid)
+        self.assertEqual(len(poly.interiors), 2)
+        self.assertAlmostEqual(poly.area, 2000 - 100 - 65 * (8 / 13) ** 2 - 37.5, places=3)
+        empty = sea(land, (300, 0, 310, 10))
+        self.assertEqual(len(empty), 1)
+        self.assertTrue(empty[0].equals(box(300, 0, 310, 10)))
+
+    def test_sea_mesh(self):
+        """ Test that the sea mesh is stored once and read back, and that routes go around the islands """
+        land = gpd.GeoDataFrame({'id': ['1', '2'], 'geometry': [box(10, 5, 20, 15), box(30, -5, 40, 30)]})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sea.npz')
+            mesh = sea_mesh(land, (0, 0, 50, 20), path)
+            self.assertTrue(os.path.exists(path))
+            stored = sea_mesh(gpd.GeoDataFrame({'id': [], 'geometry': []}), (0, 0, 50, 20), path)
+        self.assertEqual(stored.vertices, mesh.vertices)
+        self.assertEqual(stored.triangles, mesh.triangles)
+        self.assertEqual(stored.neighbors, mesh.neighbors)
+        self.assertEqual(mesh.holes, 1)
+        self.assertAlmostEqual(sum(Polygon(mesh.triangle_coordinates(t)).area for t in range(len(mesh))),
+                               1000 - 100 - 200)
+
+        router = Router(mesh)
+        path = router.shortest_path((5, 10), (25, 10))
+        self.assertFalse(LineString(path).intersects(box(10, 5, 20, 15).buffer(-1e-9)))
+        self.assertIsNone(router.shortest_path((5, 10), (45, 10)))  # the second land cuts the box in two
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from src.triangulation import triangulate_polygon
+from src.triangle_mesh import TriangleMesh
+from src.router import Router
+from src.routing import path_length
+from src.hierarchical import HierarchicalRouter
+from shapely.geometry import Polygon, Point, LineString, box
+from random import uniform, seed
+import geopandas as gpd
+
+
+def u_shape(teeth):
+    """ A U shaped polygon (the two arms are 0 <= x <= 10 and 30 <= x <= 40, joined by 0 <= y <= 10) whose outer
+    side is a saw blade with the given number of teeth per arm """
+    left = [(0 - (k % 2), 60 * k / (2 * teeth)) for k in range(2 * teeth + 1)]
+    right = [(40 + (k % 2), 60 * k / (2 * teeth)) for k in range(2 * teeth + 1)]
+    return Polygon(left[::-1] + right + [(30, 60), (30, 10), (10, 10), (10, 60)])
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        # The fine resolution has a second island (ancestor 9) which the coarse resolution lacks, and the ids of the
+        # two resolutions differ
+        self.fine_poly = u_shape(40)
+        self.fine = gpd.GeoDataFrame({'id': ['0', '1'], 'sibling_id': [7, 9],
+                                      'geometry': [self.fine_poly, box(100, 0, 110, 10)]})
+        self.coarse = gpd.GeoDataFrame({'id': ['5'], 'sibling_id': [7], 'geometry': [u_shape(2)]})
+        self.router = HierarchicalRouter(self.coarse, self.fine, margin=1)
+        self.full = Router(TriangleMesh.from_dcel(triangulate_polygon(self.fine_poly)))
+
+        seed(6)
+        self.pairs = []
+        while len(self.pairs) < 30:
+            start, dest = (uniform(-1, 41), uniform(0, 60)), (uniform(-1, 41), uniform(0, 60))
+            if self.fine_poly.contains(Point(start)) and self.fine_poly.contains(Point(dest)):
+                self.pairs.append((start, dest))
+
+    def test_corridor(self):
+        """ Test that the corridor is a piece of the fine polygon around the coarse sleeve, which connects the
+        endpoints """
+        piece = self.router.corridor((5, 55), (35, 55))
+        self.assertTrue(self.fine_poly.buffer(1e-9).covers(piece))
+        self.assertTrue(piece.covers(Point(5, 55)) and piece.covers(Point(35, 55)))
+        # Two points on the same arm do not need the other arm
+        piece = self.router.corridor((5, 55), (5, 40))
+        self.assertFalse(piece.intersects(Point(35, 30)))
+        self.assertLess(len(piece.exterior.coords), len(self.fine_poly.exterior.coords) / 2)
+
+    def test_shortest_path(self):
+        """ Test that the paths inside the corridors are as short as the paths inside the whole fine polygon """
+        for start, dest in self.pairs:
+            path = self.router.shortest_path(start, dest)
+            self.assertEqual((path[0], path[-1]), (start, dest))
+            self.assertTrue(self.fine_poly.buffer(1e-9).covers(LineString(path)))
+            self.assertAlmostEqual(path_length(path), path_length(self.full.shortest_path(start, dest)))
+
+    def test_fallback(self):
+        """ Test points outside the coarse polygon, an island without a coarse polygon and points outside the fine
+        polygons """
+        start = (-0.5, 1)  # on a tooth of the fine polygon, outside the coarse polygon
+        self.assertFalse(self.coarse.geometry[0].contains(Point(start)))
+        self.assertAlmostEqual(path_length(self.router.shortest_path(start, (35, 55))),
+                               path_length(self.full.shortest_path(start, (35, 55))))
+        self.assertIs(self.router.corridor((101, 1), (109, 9)), self.fine.geometry[1])
+        self.assertListEqual(self.router.shortest_path((101, 1), (109, 9)), [(101, 1), (109, 9)])
+        self.assertIsNone(self.router.shortest_path((5, 5), (105, 5)))
+        self.assertIsNone(self.router.shortest_path((20, 30), (5, 5)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import unittest
+from src.triangulation import triangulate_polygon, find_triangle_face_containing_point
+from src.triangle_mesh import TriangleMesh
+from src.dual_graph import DualGraph
+from src.simple_funnel import funnel_shortest_path
+from src.router import Router
+from src.routing import path_length
+from unit_tests.test_shortest_path_map import visibility_graph_distance
+from shapely.geometry import Polygon, Point, LineString
+from shapely import affinity
+from concurrent.futures import ThreadPoolExecutor
+from random import uniform, seed
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.poly = Polygon([
+            (10, 21), (11.82, 22.31), (13.48, 21.35), (14.68, 21.97),
+            (14.86, 18.85), (17.2, 19.51), (16.16, 15.91), (13.88, 16.55),
+            (15.58, 12.45), (10.76, 15.11), (9.58, 14.31), (8.54, 15.91),
+            (9, 19), (10.38, 17.95), (10.94, 19.59)
+        ])
+        self.triangulated_dcel = triangulate_polygon(self.poly)
+        self.router = Router(TriangleMesh.from_dcel(self.triangulated_dcel))
+
+        seed(0)
+        self.pairs = []
+        while len(self.pairs) < 200:
+            start = (uniform(8.5, 17.2), uniform(12.5, 22.3))
+            dest = (uniform(8.5, 17.2), uniform(12.5, 22.3))
+            if self.poly.contains(Point(start)) and self.poly.contains(Point(dest)):
+                self.pairs.append((start, dest))
+
+    def test_shortest_path_exact(self):
+        """ Test that the Router finds the exact shortest path, never longer than the (valid) path of the
+        DualGraph/funnel pipeline of main.py """
+        for start, dest in self.pairs:
+            path = self.router.shortest_path(start, dest)
+            self.assertEqual(path[0], start)
+            self.assertEqual(path[-1], dest)
+            self.assertTrue(self.poly.covers(LineString(path)))
+            self.assertAlmostEqual(path_length(path), visibility_graph_distance(self.poly, start, dest))
+
+            dual_graph = DualGraph(self.triangulated_dcel,
+                                   find_triangle_face_containing_point(self.triangulated_dcel, start))
+            old_path = funnel_shortest_path(dual_graph.path_to_point(dest), start, dest)
+            if self.poly.covers(LineString(old_path)):  # (the old funnel may also cut through the boundary)
+                self.assertLessEqual(path_length(path), path_length(old_path) + 1e-9)
+
+    def test_shortest_path_outside(self):
+        """ Test that a query with a point outside the polygon returns None """
+        self.assertIsNone(self.router.shortest_path((13, 19), (0, 0)))
+        self.assertIsNone(self.router.shortest_path((0, 0), (13, 19)))
+
+    def test_shortest_paths_from(self):
+        """ Test that the one-to-all mode reaches every destination (and only the ones inside the polygon) """
+        source = self.pairs[0][0]
+        dests = [dest for _, dest in self.pairs] + [(0, 0)]
+        paths = self.router.shortest_paths_from(source, dests)
+        self.assertIsNone(paths[-1])
+        for dest, path in zip(dests[:-1], paths[:-1]):
+            self.assertEqual(path[0], source)
+            self.assertEqual(path[-1], dest)
+
+    def test_shortest_paths(self):
+        """ Test that the thread pool batch returns the sequential results in the input order """
+        expected = [self.router.shortest_path(start, dest) for start, dest in self.pairs]
+        self.assertListEqual(self.router.shortest_paths(self.pairs, max_workers=8), expected)
+
+    def test_shortest_path_visible(self):
+        """ Test the fast path: a straight line exactly when dest is visible from start """
+        for start, dest in self.pairs:
+            path = self.router.shortest_path(start, dest)
+            self.assertEqual(len(path) == 2, self.poly.covers(LineString([start, dest])))
+        self.assertListEqual(self.router.shortest_path(self.pairs[0][0], self.pairs[0][0]), [self.pairs[0][0]])
+
+    def test_polygon_with_holes(self):
+        """ Test that the paths inside a polygon with holes (also rotated, so that no edge is horizontal) stay inside
+        the polygon and are never shorter than the geodesic """
+        poly = Polygon([(0, 0), (20, 0), (20, 20), (0, 20)], [[(2, 2), (8, 2), (8, 8), (2, 8)], [(12, 12), (18, 12), (15, 18)],
+                                                         [(10, 3), (12, 3), (11, 9)]])
+        for poly in (poly, affinity.rotate(poly, 45)):
+            router = Router(TriangleMesh.from_dcel(triangulate_polygon(poly)))
+            min_x, min_y, max_x, max_y = poly.bounds
+            routed = 0
+            while routed < 40:
+                start, dest = (uniform(min_x, max_x), uniform(min_y, max_y)), (uniform(min_x, max_x), uniform(min_y, max_y))
+                if not (poly.contains(Point(start)) and poly.contains(Point(dest))):
+                    continue
+                routed += 1
+                path = router.shortest_path(start, dest)
+                self.assertEqual((path[0], path[-1]), (start, dest))
+                self.assertTrue(poly.buffer(1e-9).covers(LineString(path)))
+                self.assertGreaterEqual(path_length(path), visibility_graph_distance(poly, start, dest) - 1e-9)
+
+    def test_search_budget(self):
+        """ Test that a sleeve that is not found within the search budget gives no path """
+        mesh = self.router.mesh
+        router = Router(mesh, search_budget=1)
+        start, dest = next((start, dest) for start, dest in self.pairs if not mesh.is_visible(start, dest))
+        self.assertIsNone(router.sleeve(start, dest))
+        self.assertIsNone(router.shortest_path(start, dest))
+        self.assertIsNotNone(self.router.shortest_path(start, dest))
+
+    def test_sleeve_cache(self):
+        """ Test that cached sleeves give the uncached answers and that the LRU cache counts hits and misses """
+        uncached = Router(self.router.mesh, cache_size=0)
+        router = Router(self.router.mesh, cache_size=4)
+        mesh = router.mesh
+        located = [(mesh.locate_point(start), mesh.locate_point(dest)) for start, dest in self.pairs]
+
+        for (start, dest), key in zip(self.pairs, located):
+            self.assertListEqual(router.shortest_path(start, dest), uncached.shortest_path(start, dest))
+            self.assertListEqual(router.sleeve(start, dest), mesh.find_sleeve(*key))
+        # Pairs that see each other take the fast path of shortest_path and do not look up the cache
+        hidden = [(start, dest) for start, dest in self.pairs if not mesh.is_visible(start, dest)]
+        self.assertGreater(len(hidden), 0)
+        info = router.cache_info()
+        self.assertEqual(info.hits + info.misses, len(self.pairs) + len(hidden))
+        self.assertEqual(info.maxsize, 4)
+        self.assertEqual(info.currsize, 4)
+        self.assertEqual(uncached.cache_info().currsize, 0)
+        self.assertEqual(uncached.cache_info().hits, 0)
+
+        # The same pair over and over again: one miss (at most) and then only hits
+        router.sleeve_cache.clear()
+        start, dest = hidden[0]
+        for _ in range(10):
+            router.shortest_path(start, dest)
+        info = router.cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (9, 1, 1))
+        self.assertAlmostEqual(info.hit_rate, 0.9)
+        self.assertIsNone(router.shortest_path(start, (0, 0)))
+        self.assertEqual(router.cache_info().misses, 1)  # points outside the mesh never reach the cache
+
+    def test_concurrency_stress(self):
+        """ Many threads hammer the same Router (and the same DualGraph) at once. Every answer must be exactly the
+        one found sequentially and the mesh must not change """
+        expected = [self.router.shortest_path(start, dest) for start, dest in self.pairs]
+        mesh = self.router.mesh
+        snapshot = (mesh.vertices, mesh.triangles, mesh.neighbors)
+
+        dual_graph = DualGraph(self.triangulated_dcel,
+                               find_triangle_face_containing_point(self.triangulated_dcel, self.pairs[0][0]))
+        expected_sleeves = [dual_graph.path_to_point(dest) for _, dest in self.pairs]
+
+        def worker(i):
+            start, dest = self.pairs[i % len(self.pairs)]
+            return (i, self.router.shortest_path(start, dest),
+                    dual_graph.path_to_point(self.pairs[i % len(self.pairs)][1]))
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            for i, path, sleeve in executor.map(worker, range(5 * len(self.pairs))):
+                self.assertListEqual(path, expected[i % len(self.pairs)])
+                self.assertListEqual(sleeve, expected_sleeves[i % len(self.pairs)])
+        self.assertEqual((mesh.vertices, mesh.triangles, mesh.neighbors), snapshot)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from src.triangulation import triangulate_polygon
+from src.triangle_mesh import TriangleMesh
+from src.router import Router
+from src.routing import BatchRouter, route_many, path_length
+from shapely.geometry import Polygon, Point, LineString
+from shapely import affinity
+from random import uniform, seed
+import numpy as np
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.poly = Polygon([
+            (10, 21), (11.82, 22.31), (13.48, 21.35), (14.68, 21.97),
+            (14.86, 18.85), (17.2, 19.51), (16.16, 15.91), (13.88, 16.55),
+            (15.58, 12.45), (10.76, 15.11), (9.58, 14.31), (8.54, 15.91),
+            (9, 19), (10.38, 17.95), (10.94, 19.59)
+        ])
+        # A second (disjoint) polygon, to the right of the first one
+        self.polygons = [self.poly, affinity.translate(self.poly, xoff=20)]
+        self.routers = [Router(TriangleMesh.from_dcel(triangulate_polygon(p))) for p in self.polygons]
+
+        seed(0)
+        self.pairs = []
+        for _ in range(300):
+            xoff = 20 * (uniform(0, 1) < 0.5)
+            start = (uniform(8.5, 17.2) + xoff, uniform(12.5, 22.3))
+            xoff = 20 * (uniform(0, 1) < 0.5)
+            dest = (uniform(8.5, 17.2) + xoff, uniform(12.5, 22.3))
+            self.pairs.append((start, dest))
+
+    def test_route_many_same_as_router(self):
+        """ Test that every pair gets the path of the Router of its polygon, in the input order """
+        paths, lengths = route_many(self.polygons, self.pairs)
+        self.assertEqual(len(paths), len(self.pairs))
+        self.assertEqual(len(lengths), len(self.pairs))
+        routed = 0
+        for (start, dest), path, length in zip(self.pairs, paths, lengths):
+            expected = None
+            for poly, router in zip(self.polygons, self.routers):
+                if poly.contains(Point(start)) and poly.contains(Point(dest)):
+                    expected = router.shortest_path(start, dest)
+            if expected is None:
+                self.assertIsNone(path)
+                self.assertTrue(np.isnan(length))
+            else:
+                routed += 1
+                self.assertListEqual(path, expected)
+                self.assertAlmostEqual(length, path_length(expected))
+        self.assertGreater(routed, 0)
+
+    def test_route_many_mesh_options(self):
+        """ Test that routing over convex cells and/or Delaunay triangles gives paths of the same length """
+        paths, lengths = route_many(self.polygons, self.pairs)
+        for convex_cells, delaunay in ((True, False), (False, True), (True, True)):
+            other_paths, other_lengths = route_many(self.polygons, self.pairs, convex_cells, delaunay)
+            self.assertListEqual([p is None for p in other_paths], [p is None for p in paths])
+            self.assertTrue(np.allclose(other_lengths, lengths, equal_nan=True))
+
+    def test_route_many_reuses_meshes(self):
+        """ Test that a polygon is triangulated once and only when one of its pairs is routed """
+        batch_router = BatchRouter(self.polygons)
+        batch_router.route_many([((13, 19), (10, 16))])
+        self.assertListEqual(list(batch_router.meshes), [0])
+        mesh = batch_router.meshes[0]
+        batch_router.route_many(self.pairs)
+        self.assertIs(batch_router.meshes[0], mesh)
+        self.assertListEqual(sorted(batch_router.meshes), [0, 1])
+
+    def test_route_many_polygon_with_holes(self):
+        """ Test that the batch router gives the paths of the Router inside a polygon with holes (the centroid search
+        tree of a start triangle and A* find sleeves of the same length) """
+        poly = Polygon([(0, 0), (20, 0), (20, 20), (0, 20)], [[(2, 2), (8, 2), (8, 8), (2, 8)], [(12, 12), (18, 12), (15, 18)],
+                                                         [(10, 3), (12, 3), (11, 9)]])
+        router = BatchRouter([poly])
+        self.assertListEqual(router.assign_polygons([(1, 1), (5, 5)]).tolist(), [0, -1])
+        pairs = [((1, 1), (19, 19)), ((1, 1), (9, 9)), ((5, 5), (9, 9)), ((19, 1), (1, 19)), ((11, 1), (11, 11))]
+        paths, lengths = router.route_many(pairs)
+        self.assertIsNone(paths[2])
+        single = Router(router.mesh(0)[0])
+        for (start, dest), path, length in zip(pairs, paths, lengths):
+            if path is not None:
+                self.assertTrue(poly.covers(LineString(path)))
+                self.assertAlmostEqual(length, path_length(single.shortest_path(start, dest)))
+        self.assertAlmostEqual(lengths[1], path_length([(1, 1), (8, 2), (9, 9)]))  # around the first hole
+
+    def test_route_many_empty(self):
+        """ Test an empty batch and a batch without any routable pair """
+        paths, lengths = route_many(self.polygons, [])
+        self.assertListEqual(paths, [])
+        self.assertEqual(len(lengths), 0)
+        paths, lengths = route_many(self.polygons, [((0, 0), (13, 19)), ((13, 19), (33, 19))])
+        self.assertListEqual(paths, [None, None])
+        self.assertTrue(np.isnan(lengths).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
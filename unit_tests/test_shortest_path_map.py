@@ -0,0 +1,80 @@
+import unittest
+import heapq
+from math import dist
+from src.triangulation import triangulate_polygon
+from src.triangle_mesh import TriangleMesh
+from src.shortest_path_map import ShortestPathMap
+from shapely.geometry import Polygon, Point, LineString
+from random import uniform, seed
+
+
+def visibility_graph_distance(poly, start, dest):
+    """ Exact geodesic distance by Dijkstra on the visibility graph of start, dest and the polygon vertices """
+    points = [start, dest] + [p for ring in [poly.exterior, *poly.interiors] for p in list(ring.coords)[:-1]]
+    distances = {start: 0.0}
+    heap = [(0.0, start)]
+    while heap:
+        d, p = heapq.heappop(heap)
+        if p == dest:
+            return d
+        if d > distances[p]:
+            continue
+        for q in points:
+            if q != p and poly.covers(LineString([p, q])) and d + dist(p, q) < distances.get(q, float('inf')):
+                distances[q] = d + dist(p, q)
+                heapq.heappush(heap, (distances[q], q))
+    return None
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.poly = Polygon([
+            (10, 21), (11.82, 22.31), (13.48, 21.35), (14.68, 21.97),
+            (14.86, 18.85), (17.2, 19.51), (16.16, 15.91), (13.88, 16.55),
+            (15.58, 12.45), (10.76, 15.11), (9.58, 14.31), (8.54, 15.91),
+            (9, 19), (10.38, 17.95), (10.94, 19.59)
+        ])
+        self.mesh = TriangleMesh.from_dcel(triangulate_polygon(self.poly))
+
+        seed(1)
+        self.points = []
+        while len(self.points) < 30:
+            p = (uniform(8.5, 17.2), uniform(12.5, 22.3))
+            if self.poly.contains(Point(p)):
+                self.points.append(p)
+
+    def test_every_triangle_has_a_funnel(self):
+        """ Test that the traversal reaches every triangle and every vertex """
+        spm = ShortestPathMap(self.mesh, self.points[0])
+        self.assertEqual(len(spm.funnels), len(self.mesh))
+        for v in self.mesh.vertices:
+            self.assertIn(v, spm.distances)
+
+    def test_distance_is_exact(self):
+        """ Compare the distances of the shortest path map with Dijkstra on the visibility graph """
+        for source in self.points[:10]:
+            spm = ShortestPathMap(self.mesh, source)
+            for dest in self.points:
+                self.assertAlmostEqual(spm.distance(dest), visibility_graph_distance(self.poly, source, dest))
+
+    def test_shortest_path(self):
+        """ Test that the path starts at the source, ends at dest, lies in the polygon and has the reported length """
+        spm = ShortestPathMap(self.mesh, self.points[0])
+        for dest in self.points + list(self.mesh.vertices):
+            path = spm.shortest_path(dest)
+            self.assertEqual(path[0], self.points[0])
+            self.assertEqual(path[-1], dest)
+            if len(path) > 1:
+                self.assertTrue(self.poly.buffer(1e-9).covers(LineString(path)))
+            self.assertAlmostEqual(sum(dist(a, b) for a, b in zip(path[:-1], path[1:])), spm.distance(dest))
+
+    def test_outside(self):
+        """ Test that a source or destination outside the polygon gives None """
+        self.assertIsNone(ShortestPathMap(self.mesh, self.points[0]).distance((0, 0)))
+        spm = ShortestPathMap(self.mesh, (0, 0))
+        self.assertIsNone(spm.source_triangle)
+        self.assertIsNone(spm.shortest_path(self.points[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from unittest import mock
-from src.simple_funnel import funnel_shortest_path
+from src.simple_funnel import (funnel_shortest_path, exact_funnel_shortest_path, exact_funnel_shortest_path_from_portals,
+                               num_of_consecutive_elements_equal_to_start, consecutive_run_lengths)
 
 
 class MyTestCase(unittest.TestCase):
@@ -39,35 +40,81 @@ class MyTestCase(unittest.TestCase):
                                   (-18.17524, 10.7498)]
 
     def test_funnel_shortest_path1(self):
-        with mock.patch('simple_funnel.find_portals', self.mocked_find_portals):
+        with mock.patch('src.simple_funnel.find_portals', self.mocked_find_portals):
             p1 = funnel_shortest_path(None, (-17.78, 11.23), (-12.68, 13.13))
         self.assertListEqual(p1, self.p1_answer)
 
     def test_funnel_shortest_path2(self):
-        with mock.patch('simple_funnel.find_portals', self.mocked_find_portals):
+        with mock.patch('src.simple_funnel.find_portals', self.mocked_find_portals):
             p2 = funnel_shortest_path(None, (-17.72, 10.96), (-12.4559, 12.52711))
         self.assertListEqual(p2, self.p2_answer)
 
     def test_funnel_shortest_path3(self):
-        with mock.patch('simple_funnel.find_portals', self.mocked_find_portals):
+        with mock.patch('src.simple_funnel.find_portals', self.mocked_find_portals):
             p3 = funnel_shortest_path(None, (-17.33132, 10.97701), (-11.82962, 12.69731))
         self.assertListEqual(p3, self.p3_answer)
 
     def test_funnel_shortest_path4(self):
-        with mock.patch('simple_funnel.find_portals', self.mocked_find_portals_reversed):
+        with mock.patch('src.simple_funnel.find_portals', self.mocked_find_portals_reversed):
             p4 = funnel_shortest_path(None, (-12.68, 13.13), (-17.78, 11.23))
         self.assertListEqual(p4, self.p4_reverse_answer)
 
     def test_funnel_shortest_path5(self):
-        with mock.patch('simple_funnel.find_portals', self.mocked_find_portals_reversed):
+        with mock.patch('src.simple_funnel.find_portals', self.mocked_find_portals_reversed):
             p5 = funnel_shortest_path(None, (-11.82962, 12.69731), (-17.33132, 10.97701))
         self.assertListEqual(p5, self.p5_reverse_answer)
 
     def test_funnel_shortest_path6(self):
-        with mock.patch('simple_funnel.find_portals', self.mocked_find_portals_reversed):
+        with mock.patch('src.simple_funnel.find_portals', self.mocked_find_portals_reversed):
             p6 = funnel_shortest_path(None, (-12.75468, 11.75601), (-18.17524, 10.7498))
         self.assertListEqual(p6, self.p6_reverse_answer)
 
+    def test_exact_funnel_shortest_path(self):
+        """ Test the exact funnel on the sleeves of the tests above (the old funnel is optimal on them) """
+        queries = [
+            (self.mocked_find_portals, (-17.78, 11.23), (-12.68, 13.13), self.p1_answer),
+            (self.mocked_find_portals, (-17.72, 10.96), (-12.4559, 12.52711), self.p2_answer),
+            (self.mocked_find_portals, (-17.33132, 10.97701), (-11.82962, 12.69731), self.p3_answer),
+            (self.mocked_find_portals_reversed, (-12.68, 13.13), (-17.78, 11.23), self.p4_reverse_answer),
+            (self.mocked_find_portals_reversed, (-11.82962, 12.69731), (-17.33132, 10.97701), self.p5_reverse_answer),
+            (self.mocked_find_portals_reversed, (-12.75468, 11.75601), (-18.17524, 10.7498), self.p6_reverse_answer)
+        ]
+        for mocked, start, end, answer in queries:
+            with mock.patch('src.simple_funnel.find_portals', mocked):
+                self.assertListEqual(exact_funnel_shortest_path(None, start, end), answer)
+
+    def test_exact_funnel_shortest_path_endpoint_on_portal(self):
+        """ Test the exact funnel when the endpoint is a portal endpoint or equal to the startpoint """
+        with mock.patch('src.simple_funnel.find_portals', self.mocked_find_portals):
+            self.assertListEqual(exact_funnel_shortest_path(None, (-17.78, 11.23), (-12.82, 9.65)),
+                                 [(-17.78, 11.23), (-17.1, 9.13), (-14.36, 9.25), (-12.82, 9.65)])
+        with mock.patch('src.simple_funnel.find_portals', lambda x: ([], [])):
+            self.assertListEqual(exact_funnel_shortest_path(None, (1, 1), (1, 1)), [(1, 1)])
+            self.assertListEqual(exact_funnel_shortest_path(None, (1, 1), (2, 2)), [(1, 1), (2, 2)])
+
+    def test_exact_funnel_sleeve_revisits_vertex(self):
+        """ Test the exact funnel on a sleeve that reaches the same vertex twice: (1.4142, 14.1421) is a top portal
+        endpoint at the 4th, 5th and again at the 10th portal. (A sleeve around a hole of a polygon with holes, this
+        used to loop forever) """
+        bot_portals = [(0.0, 28.2843), (-14.1421, 14.1421), (-14.1421, 14.1421), (-14.1421, 14.1421), (0.0, 11.3137),
+                       (0.0, 11.3137), (4.2426, 7.0711), (14.1421, 14.1421), (14.1421, 14.1421), (14.1421, 14.1421)]
+        top_portals = [(-2.1213, 23.3345), (-2.1213, 23.3345), (0.0, 16.9706), (1.4142, 14.1421), (1.4142, 14.1421),
+                       (4.9497, 9.1924), (4.9497, 9.1924), (4.9497, 9.1924), (6.364, 10.6066), (1.4142, 14.1421)]
+        self.assertListEqual(
+            exact_funnel_shortest_path_from_portals(bot_portals, top_portals, (1.9, 23.9), (7.9, 17.6)),
+            [(1.9, 23.9), (-2.1213, 23.3345), (0.0, 16.9706), (1.4142, 14.1421), (4.9497, 9.1924), (6.364, 10.6066),
+             (7.9, 17.6)]
+        )
+        # The endpoint is the revisited vertex
+        path = exact_funnel_shortest_path_from_portals(bot_portals, top_portals, (1.9, 23.9), (1.4142, 14.1421))
+        self.assertEqual(path[-1], (1.4142, 14.1421))
+        self.assertEqual(len(path), len(set(path)))
+
+
+        for lst in ([1, 1, 1, 3, 2], [1, 2, 3, 1, 1], [5, 5, 1, 5, 5], [7, 7, 7, 7, 1, 2], [], self.top_portals):
+            self.assertListEqual(consecutive_run_lengths(lst),
+                                 [num_of_consecutive_elements_equal_to_start(lst[i:]) for i in range(len(lst))])
+
     def mocked_find_portals(self, x):
         return self.bot_portals, self.top_portals
 
@@ -0,0 +1,80 @@
+import unittest
+from src.simplify import simplify_ring, simplify_polygon, simplification_report
+from src.triangulation import triangulate_polygon
+from src.triangle_mesh import TriangleMesh
+from src.routing import BatchRouter
+from shapely.geometry import Polygon, Point, LineString
+from math import cos, sin, pi
+from random import Random
+import numpy as np
+
+
+def wiggly_ring(center, radius, n, amplitude, rng):
+    """ A star shaped ring of n vertices whose radius varies by up to amplitude """
+    return [(center[0] + (radius + rng.uniform(-amplitude, amplitude)) * cos(2 * pi * k / n),
+             center[1] + (radius + rng.uniform(-amplitude, amplitude)) * sin(2 * pi * k / n)) for k in range(n)]
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        rng = Random(3)
+        self.poly = Polygon(wiggly_ring((0, 0), 10, 400, 0.3, rng), [wiggly_ring((-4, 0), 2, 100, 0.1, rng),
+                                                                   wiggly_ring((4, 0), 2, 100, 0.1, rng)])
+        # A comb whose teeth are closer to each other than the tolerance: plain Douglas-Peucker makes it cross itself
+        teeth = [(x, y) for k in range(20) for x, y in ((2 * k, 0), (2 * k, 10), (2 * k + 0.1, 10), (2 * k + 0.1, 0.2))]
+        self.comb = Polygon(teeth + [(40, 0), (40, -1), (0, -1)])
+
+    def test_simplify_ring(self):
+        """ Test that every removed vertex lies within the tolerance of the simplified ring """
+        ring = np.asarray(self.poly.exterior.coords)[:-1]
+        for tolerance in (0.05, 0.3, 1, 100):
+            kept = simplify_ring(ring, tolerance)
+            self.assertGreaterEqual(len(kept), 3)
+            self.assertLess(len(kept), len(ring))
+            simplified = Polygon(ring[kept]).exterior
+            self.assertLessEqual(max(simplified.distance(Point(p)) for p in ring), tolerance + 1e-9)
+        self.assertListEqual(simplify_ring(ring, 0).tolist(), list(range(len(ring))))
+        self.assertListEqual(simplify_ring([(0, 0), (1, 0), (0, 1)], 5).tolist(), [0, 1, 2])
+
+    def test_simplify_polygon(self):
+        """ Test that the simplified polygons are simple, keep their holes and can be triangulated """
+        for poly in (self.poly, self.comb):
+            for tolerance in (0.05, 0.5, 2, 20):
+                simplified = simplify_polygon(poly, tolerance)
+                self.assertTrue(simplified.is_valid)
+                self.assertEqual(len(simplified.interiors), len(poly.interiors))
+                self.assertLessEqual(len(simplified.exterior.coords), len(poly.exterior.coords))
+                mesh = TriangleMesh.from_dcel(triangulate_polygon(simplified))
+                self.assertEqual(mesh.holes, len(poly.interiors))
+        # Douglas-Peucker alone would join the tips of the teeth across the gaps
+        ring = np.asarray(self.comb.exterior.coords)[:-1]
+        self.assertFalse(Polygon(ring[simplify_ring(ring, 0.5)]).is_valid)
+        simplified = simplify_polygon(self.comb, 0.5)
+        self.assertTrue(simplified.is_valid)
+        self.assertLess(len(simplified.exterior.coords), len(self.comb.exterior.coords))
+
+    def test_report(self):
+        """ Test the vertex reduction of the report """
+        report = simplification_report([self.poly], [0, 0.5])
+        self.assertEqual(report[0]['vertices'], 600)
+        self.assertEqual(report[0]['reduction'], 0)
+        self.assertEqual(report[1]['vertices'], sum(len(ring.coords) - 1 for ring in [
+            simplify_polygon(self.poly, 0.5).exterior, *simplify_polygon(self.poly, 0.5).interiors]))
+        self.assertGreater(report[1]['reduction'], 0.5)
+        self.assertGreater(report[1]['speedup'], 0)
+        self.assertIsNone(simplification_report([self.poly], [0.5])[0]['speedup'])
+
+    def test_batch_router(self):
+        """ Test routing on the simplified polygon, one BatchRouter per tolerance """
+        pairs = [((-8, 0), (8, 0)), ((0, -8), (0, 8))]
+        exact, simplified = BatchRouter([self.poly]), BatchRouter([self.poly], tolerance=0.5)
+        paths, lengths = exact.route_many(pairs)
+        simple_paths, simple_lengths = simplified.route_many(pairs)
+        self.assertLess(len(simplified.mesh(0)[0]), len(exact.mesh(0)[0]) / 2)
+        for path, length in zip(simple_paths, simple_lengths):
+            self.assertTrue(simplify_polygon(self.poly, 0.5).covers(LineString(path)))
+        self.assertTrue(np.allclose(simple_lengths, lengths, rtol=0.1))
+
+
+if __name__ == '__main__':
+    unittest.main()
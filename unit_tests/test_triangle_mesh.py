@@ -0,0 +1,189 @@
+import unittest
+from src.triangulation import triangulate_polygon, triangle_face_contains_point
+from src.triangle_mesh import TriangleMesh, TriangleGrid, sleeve_from_tree
+from src.dual_graph import DualGraph
+from src.convex_partition import convex_partition_polygon
+from shapely.geometry import Polygon, Point, LineString
+from random import uniform
+from math import dist
+import tempfile
+import os
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.poly = Polygon([
+            (10, 21), (11.82, 22.31), (13.48, 21.35), (14.68, 21.97),
+            (14.86, 18.85), (17.2, 19.51), (16.16, 15.91), (13.88, 16.55),
+            (15.58, 12.45), (10.76, 15.11), (9.58, 14.31), (8.54, 15.91),
+            (9, 19), (10.38, 17.95), (10.94, 19.59)
+        ])
+        self.triangulated_dcel = triangulate_polygon(self.poly)
+        self.mesh = TriangleMesh.from_dcel(self.triangulated_dcel)
+
+    def test_from_dcel(self):
+        """ Test that the mesh has one triangle per bounded face and that the neighbors are symmetric """
+        bounded_faces = [f for f in self.triangulated_dcel.faces if f.outer_component is not None]
+        self.assertEqual(len(self.mesh), len(bounded_faces))
+        self.assertEqual(len(self.mesh.vertices), len(self.poly.exterior.coords) - 1)
+        for t, adj in enumerate(self.mesh.neighbors):
+            for n in adj:
+                if n != -1:
+                    self.assertIn(t, self.mesh.neighbors[n])
+        # n - 2 triangles have 2(n - 2) - n = n - 4 diagonals, each one counted twice
+        self.assertEqual(sum(n != -1 for adj in self.mesh.neighbors for n in adj), 2 * (len(self.mesh.vertices) - 3))
+
+    def test_triangles_ccw(self):
+        """ Test that every triangle is given in counter-clockwise order """
+        for t in range(len(self.mesh)):
+            a, b, c = self.mesh.triangle_coordinates(t)
+            self.assertGreater((b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]), 0)
+
+    def test_locate_point(self):
+        """ Test that points inside the polygon are located and points outside are not """
+        for _ in range(1000):
+            p = (uniform(8, 18), uniform(12, 23))
+            t = self.mesh.locate_point(p)
+            if self.poly.contains(Point(p)):
+                self.assertIsNotNone(t)
+                self.assertTrue(Polygon(self.mesh.triangle_coordinates(t)).intersects(Point(p)))
+            elif not self.poly.intersects(Point(p)):
+                self.assertIsNone(t)
+
+    def test_locate_points(self):
+        """ Test that the batch point location agrees with locate_point """
+        points = [(uniform(8, 18), uniform(12, 23)) for _ in range(500)]
+        located = self.mesh.locate_points(points, chunk_size=64)
+        self.assertEqual(len(located), len(points))
+        for p, t in zip(points, located):
+            expected = self.mesh.locate_point(p)
+            if expected is None:
+                self.assertEqual(t, -1)
+            else:
+                self.assertNotEqual(t, -1)
+                self.assertTrue(Polygon(self.mesh.triangle_coordinates(t)).intersects(Point(p)))
+        self.assertEqual(len(self.mesh.locate_points([])), 0)
+
+    def test_grid_locate_points(self):
+        """ Test that the grid point location returns exactly the triangles of the brute force batch location """
+        points = [(uniform(8, 18), uniform(12, 23)) for _ in range(2000)]
+        points += list(self.mesh.vertices)  # points shared by several triangles
+        for cells in (None, 1, 7, 400):
+            grid = TriangleGrid(self.mesh, cells=cells)
+            self.assertListEqual(grid.locate_points(points).tolist(), self.mesh.locate_points(points).tolist())
+        self.assertEqual(len(TriangleGrid(self.mesh).locate_points([])), 0)
+
+    def test_is_visible(self):
+        """ Test the segment walk against shapely, also for segments between vertices of the polygon """
+        points = []
+        while len(points) < 40:
+            p = (uniform(8, 18), uniform(12, 23))
+            if self.poly.contains(Point(p)):
+                points.append(p)
+        pairs = [(p, q) for p in points for q in points[:20]]
+        pairs += [(p, q) for p in self.mesh.vertices for q in self.mesh.vertices if p != q]
+        visible = self.mesh.are_visible(pairs)
+        for (p, q), v in zip(pairs, visible):
+            self.assertEqual(self.mesh.is_visible(p, q), v)
+            self.assertEqual(v, self.poly.covers(LineString([p, q])))
+        self.assertFalse(self.mesh.is_visible((0, 0), points[0]))
+        self.assertFalse(self.mesh.is_visible(points[0], (0, 0)))
+        self.assertListEqual(self.mesh.are_visible([((0, 0), points[0])]).tolist(), [False])
+        self.assertEqual(len(self.mesh.are_visible([])), 0)
+
+    def test_is_visible_through_vertex(self):
+        """ Test segments that pass exactly through a reflex vertex of the polygon """
+        poly = Polygon([(0, 0), (10, 0), (10, 10), (6, 10), (5, 5), (4, 10), (0, 10)])
+        mesh = TriangleMesh.from_dcel(triangulate_polygon(poly))
+        for t in range(len(mesh)):
+            self.assertGreater(Polygon(mesh.triangle_coordinates(t)).area, 0)
+        pairs = [((8, 5), (3.5, 5)), ((9, 1), (3, 7)), ((3.5, 5), (8, 5)), ((3, 7), (9, 1)),
+                 ((5, 8), (5, 2)), ((7, 9), (3, 1))]
+        for p, q in pairs:
+            self.assertEqual(mesh.is_visible(p, q), poly.covers(LineString([p, q])))
+        self.assertListEqual(mesh.are_visible(pairs).tolist(), [True] * 4 + [False, True])
+
+    def test_holes(self):
+        """ Test that the number of holes is the number of independent cycles of the dual graph """
+        self.assertEqual(self.mesh.holes, 0)
+        poly = Polygon([(0, 0), (20, 0), (20, 20), (0, 20)], [[(2, 2), (8, 2), (8, 8), (2, 8)], [(12, 12), (18, 12), (15, 18)],
+                                                         [(10, 3), (12, 3), (11, 9)]])
+        self.assertEqual(TriangleMesh.from_dcel(triangulate_polygon(poly)).holes, 3)
+
+    def test_find_sleeve_with_holes(self):
+        """ Test the A* sleeves of a polygon with holes against the Dijkstra search tree, and the search budget """
+        poly = Polygon([(0, 0), (20, 0), (20, 20), (0, 20)], [[(2, 2), (8, 2), (8, 8), (2, 8)], [(12, 12), (18, 12), (15, 18)],
+                                                         [(10, 3), (12, 3), (11, 9)]])
+        mesh = TriangleMesh.from_dcel(triangulate_polygon(poly))
+
+        def centroid_length(sleeve):
+            return sum(dist(mesh.centroids[t1], mesh.centroids[t2]) for t1, t2 in zip(sleeve[:-1], sleeve[1:]))
+
+        for t_start in range(len(mesh)):
+            parent = mesh.sleeve_tree(t_start)
+            self.assertEqual(len(parent), len(mesh))
+            for t_end in range(len(mesh)):
+                sleeve = mesh.find_sleeve(t_start, t_end)
+                self.assertEqual((sleeve[0], sleeve[-1]), (t_start, t_end))
+                self.assertEqual(len(set(sleeve)), len(sleeve))
+                for t1, t2 in zip(sleeve[:-1], sleeve[1:]):
+                    self.assertIn(t2, mesh.neighbors[t1])
+                self.assertAlmostEqual(centroid_length(sleeve), centroid_length(sleeve_from_tree(parent, t_end)))
+
+        far = max(range(len(mesh)), key=lambda t: dist(mesh.centroids[0], mesh.centroids[t]))
+        self.assertIsNone(mesh.find_sleeve(0, far, budget=1))
+        self.assertListEqual(mesh.find_sleeve(0, 0, budget=0), [0])
+        self.assertLessEqual(len(mesh.sleeve_tree(0, budget=3)), 4)
+        self.assertIn(far, mesh.sleeve_tree(0, targets=[far]))
+        near = next(n for n in mesh.neighbors[0] if n != -1)
+        self.assertLess(len(mesh.sleeve_tree(0, targets=[near])), len(mesh))
+
+    def test_save_load_concatenate(self):
+        """ Test that a mesh (also of convex cells) is stored and read back unchanged, and the concatenation of two
+        meshes """
+        cells = TriangleMesh.from_dcel(convex_partition_polygon(self.poly))
+        with tempfile.TemporaryDirectory() as directory:
+            for mesh in (self.mesh, cells):
+                path = os.path.join(directory, 'mesh.npz')
+                mesh.save(path)
+                stored = TriangleMesh.load(path)
+                self.assertEqual(stored.vertices, mesh.vertices)
+                self.assertEqual(stored.triangles, mesh.triangles)
+                self.assertEqual(stored.neighbors, mesh.neighbors)
+
+        both = TriangleMesh.concatenate([self.mesh, cells])
+        self.assertEqual(len(both), len(self.mesh) + len(cells))
+        self.assertEqual(both.holes, 0)
+        self.assertEqual(both.triangle_coordinates(len(self.mesh)), cells.triangle_coordinates(0))
+        self.assertEqual(both.find_sleeve(0, len(self.mesh)), None)
+        self.assertEqual(len(TriangleMesh.concatenate([])), 0)
+
+    def test_find_sleeve_and_portals(self):
+        """ Test that the sleeve (and its portals) is the same as the one found by the DualGraph """
+        faces = {}  # Key: triangle ID, Value: Face
+        for f in self.triangulated_dcel.faces:
+            if f.outer_component is not None:
+                for t in range(len(self.mesh)):
+                    if Polygon(self.mesh.triangle_coordinates(t)).equals(
+                            Polygon([h.coordinates for h in self.triangulated_dcel.find_all_vertices_bounding_face(f)])):
+                        faces[t] = f
+        for t_start in range(len(self.mesh)):
+            dg = DualGraph(self.triangulated_dcel, faces[t_start])
+            for t_end in range(len(self.mesh)):
+                sleeve = self.mesh.find_sleeve(t_start, t_end)
+                self.assertEqual(sleeve[0], t_start)
+                self.assertEqual(sleeve[-1], t_end)
+                a, b, c = self.mesh.triangle_coordinates(t_end)
+                centroid = ((a[0] + b[0] + c[0]) / 3, (a[1] + b[1] + c[1]) / 3)
+                self.assertTrue(triangle_face_contains_point(faces[t_end], centroid))
+                self.assertListEqual([faces[t] for t in sleeve], dg.path_to_point(centroid))
+
+                bot_portals, top_portals = self.mesh.portals(sleeve)
+                self.assertEqual(len(bot_portals), len(sleeve) - 1)
+                for t1, t2, bot, top in zip(sleeve[:-1], sleeve[1:], bot_portals, top_portals):
+                    self.assertIn(bot, self.mesh.triangle_coordinates(t1))
+                    self.assertIn(top, self.mesh.triangle_coordinates(t2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,8 @@ import unittest
 import geopandas as gpd
 import matplotlib.pyplot as plt
 from shapely.geometry import Polygon
+from random import Random
+from math import pi, cos, sin
 from src.dcel import Dcel
 from src.triangulation import (make_monotone, assign_type_to_vertices, angle_between_points_ccw,
                            triangulate_polygon, point_in_triangle)
@@ -120,6 +122,40 @@ class MyTestCase(unittest.TestCase):
                 count += 1
             self.assertEqual(count, 3)
 
+    def test_triangulate_polygon_with_holes(self):
+        """ Test the triangulation of random polygons with holes: only triangles, n + 2h - 2 of them (n vertices, h
+        holes), all inside the polygon and with the area of the polygon """
+        rng = Random(7)
+        for _ in range(30):
+            # star-shaped exterior and small star-shaped holes that do not touch each other or the exterior
+            angles = sorted(rng.uniform(0, 2 * pi) for _ in range(rng.randint(8, 40)))
+            exterior = [(r * cos(a), r * sin(a)) for a, r in zip(angles, (rng.uniform(12, 20) for _ in angles))]
+            holes = []
+            for _ in range(rng.randint(1, 15)):
+                cx, cy = rng.uniform(-9, 9), rng.uniform(-9, 9)
+                hole_angles = sorted(rng.uniform(0, 2 * pi) for _ in range(rng.randint(3, 8)))
+                hole = Polygon([(cx + r * cos(a), cy + r * sin(a))
+                                for a, r in zip(hole_angles, (rng.uniform(0.5, 2) for _ in hole_angles))])
+                if (hole.is_valid and Polygon(exterior).buffer(-0.1).contains(hole)
+                        and all(hole.distance(other) > 0.1 for other in holes)):
+                    holes.append(hole)
+            poly = Polygon(exterior, [hole.exterior.coords for hole in holes])
+            self.assertTrue(poly.is_valid)
+
+            triangulated_dcel = triangulate_polygon(poly)
+            triangles = []
+            for f in triangulated_dcel.faces:
+                if f.outer_component is not None:
+                    self.assertListEqual(f.inner_components, [])
+                    triangles.append(Polygon([v.coordinates
+                                              for v in triangulated_dcel.find_all_vertices_bounding_face(f)]))
+            self.assertEqual(len(triangles), len(triangulated_dcel.vertices) + 2 * len(holes) - 2)
+            inside = poly.buffer(1e-9)
+            for triangle in triangles:
+                self.assertEqual(len(triangle.exterior.coords), 4)
+                self.assertTrue(inside.contains(triangle))
+            self.assertAlmostEqual(sum(triangle.area for triangle in triangles), poly.area)
+
     def test_triangulate_polygon_hedges_no_none_attribute(self):
         """ Test if all edges have no None attributes """
         triangulated_dcel = triangulate_polygon(self.poly)